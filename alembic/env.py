@@ -37,6 +37,8 @@ import app.models.profile
 import app.models.progress
 import app.models.chat
 import app.models.memory
+import app.models.question_embedding
+import app.models.question_fingerprint
 
 # set target metadata for 'autogenerate' support
 target_metadata = Base.metadata
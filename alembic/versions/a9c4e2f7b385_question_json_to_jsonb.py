@@ -0,0 +1,127 @@
+"""question content/options/answers JSON -> JSONB
+
+Revision ID: a9c4e2f7b385
+Revises: f2b8d4e6a913
+Create Date: 2026-10-19 16:03:57.118240
+
+Online conversion: a plain ALTER COLUMN ... TYPE jsonb rewrites the table
+under an ACCESS EXCLUSIVE lock. Instead we
+
+  1. add nullable *_jsonb shadow columns and a trigger that keeps them in
+     sync with writes made while the migration runs,
+  2. backfill them in small committed batches,
+  3. prove NOT NULL with validated CHECK constraints (no exclusive lock),
+  4. swap the columns in one short transaction.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c4e2f7b385'
+down_revision: Union[str, None] = 'f2b8d4e6a913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 1000
+# As created by c3d8f5a1e6b2
+SEARCH_VECTOR_TRIGGER = """
+    CREATE TRIGGER questions_search_vector
+    BEFORE INSERT OR UPDATE OF content, options ON questions
+    FOR EACH ROW EXECUTE FUNCTION questions_search_vector_update();
+"""
+COLUMNS = {'content': '[]', 'options': '[]', 'answers': '{}'}
+
+
+def _backfill(statement: sa.TextClause) -> None:
+    if op.get_context().as_sql:
+        # Offline (--sql) mode can't loop on rowcount; emit a single pass
+        op.execute(statement.bindparams(batch=2 ** 31 - 1))
+    else:
+        conn = op.get_bind()
+        while conn.execute(statement, {"batch": BACKFILL_BATCH}).rowcount:
+            pass
+
+
+def upgrade() -> None:
+    for column in COLUMNS:
+        op.add_column('questions', sa.Column(f'{column}_jsonb', postgresql.JSONB(), nullable=True))
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION questions_jsonb_sync() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.content_jsonb := NEW.content::jsonb;
+            NEW.options_jsonb := NEW.options::jsonb;
+            NEW.answers_jsonb := NEW.answers::jsonb;
+            RETURN NEW;
+        END
+        $$;
+    """)
+    op.execute("""
+        CREATE TRIGGER questions_jsonb_sync
+        BEFORE INSERT OR UPDATE ON questions
+        FOR EACH ROW EXECUTE FUNCTION questions_jsonb_sync();
+    """)
+
+    with op.get_context().autocommit_block():
+        _backfill(sa.text("""
+            UPDATE questions
+            SET content_jsonb = content::jsonb,
+                options_jsonb = options::jsonb,
+                answers_jsonb = answers::jsonb
+            WHERE id IN (
+                SELECT id FROM questions WHERE content_jsonb IS NULL LIMIT :batch
+            )
+        """))
+        for column in COLUMNS:
+            op.execute(
+                f"ALTER TABLE questions ADD CONSTRAINT questions_{column}_jsonb_not_null "
+                f"CHECK ({column}_jsonb IS NOT NULL) NOT VALID"
+            )
+            op.execute(f"ALTER TABLE questions VALIDATE CONSTRAINT questions_{column}_jsonb_not_null")
+
+    # The swap: metadata-only changes, so the lock is held only briefly.
+    # SET NOT NULL skips the table scan thanks to the validated constraints.
+    op.execute("LOCK TABLE questions IN ACCESS EXCLUSIVE MODE")
+    op.execute("DROP TRIGGER questions_jsonb_sync ON questions")
+    op.execute("DROP FUNCTION questions_jsonb_sync()")
+    # It lists content/options, so it has to go with the old columns
+    op.execute("DROP TRIGGER questions_search_vector ON questions")
+    for column, default in COLUMNS.items():
+        op.drop_column('questions', column)
+        op.alter_column('questions', f'{column}_jsonb', new_column_name=column)
+        op.alter_column(
+            'questions', column, nullable=False, server_default=sa.text(f"'{default}'::jsonb"),
+        )
+        op.drop_constraint(f'questions_{column}_jsonb_not_null', 'questions', type_='check')
+    op.execute(SEARCH_VECTOR_TRIGGER)
+
+    # Preview text as build_preview_text computes it: first paragraph, 100 chars.
+    # Used to backfill questions.preview_text (b5d7e9f1c248).
+    op.execute("""
+        CREATE OR REPLACE FUNCTION question_preview_text(content jsonb) RETURNS text
+        LANGUAGE sql IMMUTABLE AS $$
+            SELECT CASE WHEN length(t) > 100 THEN left(t, 100) || '...' ELSE t END
+            FROM (
+                SELECT jsonb_path_query_first(content, 'lax $[*] ? (@.type == "paragraph").text') #>> '{}' AS t
+            ) first_paragraph
+        $$;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS question_preview_text(jsonb);")
+    # Going back to json is a full rewrite either way; do it in place.
+    # Columns named in a trigger's column list can't change type.
+    op.execute("DROP TRIGGER questions_search_vector ON questions")
+    for column, default in COLUMNS.items():
+        op.alter_column('questions', column, server_default=None)
+        op.alter_column(
+            'questions', column, type_=sa.JSON(), postgresql_using=f'{column}::json',
+            server_default=default,
+        )
+    op.execute(SEARCH_VECTOR_TRIGGER)
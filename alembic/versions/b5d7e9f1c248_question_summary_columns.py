@@ -0,0 +1,63 @@
+"""denormalized question summary columns: preview_text, first_subquestion_id
+
+Revision ID: b5d7e9f1c248
+Revises: a9c4e2f7b385
+Create Date: 2026-10-19 17:12:30.554018
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d7e9f1c248'
+down_revision: Union[str, None] = 'a9c4e2f7b385'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 1000
+
+# Same rules as QuestionService: build_preview_text / refresh_first_subquestions
+BACKFILL = """
+    WITH batch AS (
+        SELECT id FROM questions {where} ORDER BY id {limit}
+    )
+    UPDATE questions q
+    SET preview_text = question_preview_text(q.content),
+        first_subquestion_id = (
+            SELECT c.id FROM questions c
+            WHERE c.parent_id = q.id AND NOT c.is_deleted
+            ORDER BY coalesce(c."order", 0), c.id
+            LIMIT 1
+        )
+    FROM batch
+    WHERE q.id = batch.id
+    RETURNING q.id
+"""
+
+
+def upgrade() -> None:
+    op.add_column('questions', sa.Column('preview_text', sa.String(), nullable=True))
+    op.add_column('questions', sa.Column('first_subquestion_id', postgresql.UUID(as_uuid=True), nullable=True))
+
+    with op.get_context().autocommit_block():
+        if op.get_context().as_sql:
+            # Offline (--sql) mode can't page through ids; emit a single pass
+            op.execute(BACKFILL.format(where="", limit=""))
+        else:
+            # Page by id rather than "IS NULL": questions without a paragraph keep a NULL preview
+            conn = op.get_bind()
+            statement = sa.text(BACKFILL.format(where="WHERE id > :after", limit="LIMIT :batch"))
+            after = '00000000-0000-0000-0000-000000000000'
+            while True:
+                ids = conn.execute(statement, {"after": after, "batch": BACKFILL_BATCH}).scalars().all()
+                if not ids:
+                    break
+                after = str(max(ids))
+
+
+def downgrade() -> None:
+    op.drop_column('questions', 'first_subquestion_id')
+    op.drop_column('questions', 'preview_text')
@@ -0,0 +1,36 @@
+"""question tags/extras GIN indexes
+
+Revision ID: b7e2c41f9a03
+Revises: 5d5050aa54b9
+Create Date: 2026-10-19 10:02:11.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c41f9a03'
+down_revision: Union[str, None] = '5d5050aa54b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Build concurrently so the questions table stays writable during the deploy
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_questions_tags', 'questions', ['tags'],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_questions_extras', 'questions', ['extras'],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_questions_extras', table_name='questions', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_questions_tags', table_name='questions', postgresql_concurrently=True, if_exists=True)
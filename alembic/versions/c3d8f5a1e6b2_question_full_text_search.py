@@ -0,0 +1,97 @@
+"""question full-text search
+
+Revision ID: c3d8f5a1e6b2
+Revises: b7e2c41f9a03
+Create Date: 2026-10-19 11:24:47.902315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d8f5a1e6b2'
+down_revision: Union[str, None] = 'b7e2c41f9a03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 1000
+SEARCH_VECTOR_TRIGGER = """
+    CREATE TRIGGER questions_search_vector
+    BEFORE INSERT OR UPDATE OF content, options ON questions
+    FOR EACH ROW EXECUTE FUNCTION questions_search_vector_update();
+"""
+
+
+def upgrade() -> None:
+    op.add_column('questions', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    # Text of a content/options block array: paragraph text, table/matrix
+    # headers and cells, and option block text (what tutoring_bot.extract_text walks)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION question_block_text(blocks jsonb) RETURNS text
+        LANGUAGE sql IMMUTABLE AS $$
+            SELECT coalesce(string_agg(part #>> '{}', ' '), '')
+            FROM (
+                SELECT jsonb_path_query(blocks, 'lax $[*].text') AS part
+                UNION ALL SELECT jsonb_path_query(blocks, 'lax $[*].headers[*]')
+                UNION ALL SELECT jsonb_path_query(blocks, 'lax $[*].rows[*][*]')
+                UNION ALL SELECT jsonb_path_query(blocks, 'lax $[*].blocks[*].text')
+            ) parts
+            WHERE jsonb_typeof(part) = 'string'
+        $$;
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION question_search_vector(content jsonb, options jsonb) RETURNS tsvector
+        LANGUAGE sql IMMUTABLE AS $$
+            SELECT setweight(to_tsvector('english', question_block_text(content)), 'A')
+                || setweight(to_tsvector('english', question_block_text(options)), 'B')
+        $$;
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION questions_search_vector_update() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.search_vector := question_search_vector(NEW.content::jsonb, NEW.options::jsonb);
+            RETURN NEW;
+        END
+        $$;
+    """)
+    # Only text edits recompute it; flag/order/summary updates skip the trigger.
+    # The column list ties it to content/options: migrations that drop or
+    # retype them must drop and recreate it (see a9c4e2f7b385).
+    op.execute(SEARCH_VECTOR_TRIGGER)
+
+    # Backfill in small committed batches so rows are never locked for long
+    backfill = sa.text("""
+        UPDATE questions
+        SET search_vector = question_search_vector(content::jsonb, options::jsonb)
+        WHERE id IN (
+            SELECT id FROM questions WHERE search_vector IS NULL LIMIT :batch
+        )
+    """)
+    with op.get_context().autocommit_block():
+        if op.get_context().as_sql:
+            # Offline (--sql) mode can't loop on rowcount; emit a single pass
+            op.execute(backfill.bindparams(batch=2 ** 31 - 1))
+        else:
+            conn = op.get_bind()
+            while conn.execute(backfill, {"batch": BACKFILL_BATCH}).rowcount:
+                pass
+
+        op.create_index(
+            'ix_questions_search_vector', 'questions', ['search_vector'],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_questions_search_vector', table_name='questions', postgresql_concurrently=True, if_exists=True)
+    op.execute("DROP TRIGGER IF EXISTS questions_search_vector ON questions;")
+    op.execute("DROP FUNCTION IF EXISTS questions_search_vector_update();")
+    op.execute("DROP FUNCTION IF EXISTS question_search_vector(jsonb, jsonb);")
+    op.execute("DROP FUNCTION IF EXISTS question_block_text(jsonb);")
+    op.drop_column('questions', 'search_vector')
@@ -0,0 +1,31 @@
+"""index user_memory by (user_id, type)
+
+Revision ID: c8e4a2f6d159
+Revises: b5d7e9f1c248
+Create Date: 2026-10-19 18:40:12.906331
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e4a2f6d159'
+down_revision: Union[str, None] = 'b5d7e9f1c248'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Build concurrently so chat keeps writing memories during the deploy
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_memory_user_id_type', 'user_memory', ['user_id', 'type'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_memory_user_id_type', table_name='user_memory', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,43 @@
+"""question embeddings for similar-question lookups
+
+Revision ID: d41a7e0c2b58
+Revises: c3d8f5a1e6b2
+Create Date: 2026-10-19 13:05:32.617440
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import pgvector
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a7e0c2b58'
+down_revision: Union[str, None] = 'c3d8f5a1e6b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'question_embeddings',
+        sa.Column('question_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('embedding', pgvector.sqlalchemy.vector.VECTOR(dim=1536), nullable=False),
+        sa.Column('text_hash', sa.String(length=64), nullable=False),
+        sa.Column('similar_ids', postgresql.ARRAY(postgresql.UUID(as_uuid=True)), server_default='{}', nullable=False),
+        sa.Column('similar_refreshed_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('question_id'),
+    )
+    # HNSW needs pgvector >= 0.5.0; the table is new, so no need to build concurrently
+    op.create_index(
+        'ix_question_embeddings_embedding', 'question_embeddings', ['embedding'],
+        postgresql_using='hnsw', postgresql_ops={'embedding': 'vector_cosine_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_question_embeddings_embedding', table_name='question_embeddings')
+    op.drop_table('question_embeddings')
@@ -0,0 +1,40 @@
+"""questions.deleted_with_parent: subquestions soft-deleted by their parent
+
+Revision ID: e2a7c9d4b610
+Revises: c8e4a2f6d159
+Create Date: 2026-10-19 21:05:38.417902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c9d4b610'
+down_revision: Union[str, None] = 'c8e4a2f6d159'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant default: metadata-only, no table rewrite
+    op.add_column(
+        'questions',
+        sa.Column('deleted_with_parent', sa.Boolean(), nullable=False, server_default=sa.text('false')),
+    )
+    # Cascades made before this column existed stamped the children with the
+    # parent's updated_at; mark those so restoring the parent still brings them back
+    op.execute("""
+        UPDATE questions c
+        SET deleted_with_parent = true
+        FROM questions p
+        WHERE c.parent_id = p.id
+          AND c.is_deleted AND p.is_deleted
+          AND c.updated_at = p.updated_at
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('questions', 'deleted_with_parent')
@@ -0,0 +1,45 @@
+"""question fingerprints for near-duplicate detection
+
+Revision ID: e6f1a9c3d720
+Revises: d41a7e0c2b58
+Create Date: 2026-10-19 14:22:08.903215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6f1a9c3d720'
+down_revision: Union[str, None] = 'd41a7e0c2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'question_fingerprints',
+        sa.Column('question_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('signature', postgresql.ARRAY(sa.BigInteger()), nullable=False),
+        sa.Column('bands', postgresql.ARRAY(sa.BigInteger()), nullable=False),
+        sa.Column('duplicate_of', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('similarity', sa.Float(), nullable=True),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['duplicate_of'], ['questions.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('question_id'),
+    )
+    # No pending list: imports probe the index right after inserting into it
+    op.create_index(
+        'ix_question_fingerprints_bands', 'question_fingerprints', ['bands'],
+        postgresql_using='gin', postgresql_with={'fastupdate': 'off'},
+    )
+    op.create_index('ix_question_fingerprints_duplicate_of', 'question_fingerprints', ['duplicate_of'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_question_fingerprints_duplicate_of', table_name='question_fingerprints')
+    op.drop_index('ix_question_fingerprints_bands', table_name='question_fingerprints')
+    op.drop_table('question_fingerprints')
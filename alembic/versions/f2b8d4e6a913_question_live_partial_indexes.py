@@ -0,0 +1,46 @@
+"""partial indexes over live (not soft-deleted) questions
+
+Revision ID: f2b8d4e6a913
+Revises: e6f1a9c3d720
+Create Date: 2026-10-19 15:10:44.271906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8d4e6a913'
+down_revision: Union[str, None] = 'e6f1a9c3d720'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = sa.text('NOT is_deleted')
+
+
+def upgrade() -> None:
+    op.alter_column('questions', 'is_deleted', server_default=sa.text('false'))
+    # Build concurrently so the questions table stays writable during the deploy
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_questions_live_type_difficulty', 'questions', ['type', 'difficulty'],
+            postgresql_where=LIVE, postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_questions_live_parent_id', 'questions', ['parent_id', 'order'],
+            postgresql_where=LIVE, postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_questions_live_difficulty', 'questions', ['difficulty'],
+            postgresql_where=LIVE, postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_questions_live_difficulty', table_name='questions', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_questions_live_parent_id', table_name='questions', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_questions_live_type_difficulty', table_name='questions', postgresql_concurrently=True, if_exists=True)
+    op.alter_column('questions', 'is_deleted', server_default=None)
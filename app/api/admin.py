@@ -0,0 +1,128 @@
+# app/api/admin.py
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from app.observability.memory import memory_diagnostics
+from app.observability.profiler import list_profiles, profile_path, profiler_settings
+from app.observability.query_stats import endpoint_query_stats
+from app.schemas.diagnostics import (
+    AllocationSiteRead,
+    EndpointMemoryRead,
+    MemorySnapshotCreate,
+    MemorySnapshotRead,
+    MemoryStatusRead,
+    MemoryTraceStart,
+    ProfileFileRead,
+    ProfilerSettingsRead,
+    ProfilerSettingsUpdate,
+)
+from app.services.auth import require_admin
+
+# Every route here needs the X-Admin-Token header
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/profiler", response_model=ProfilerSettingsRead)
+def get_profiler_settings():
+    return profiler_settings.as_dict()
+
+@router.put("/profiler", response_model=ProfilerSettingsRead)
+def update_profiler_settings(payload: ProfilerSettingsUpdate):
+    """
+    Change request sampling without a redeploy. Applies to this worker
+    process only. Requests sent with X-Profile: <admin token> are profiled
+    regardless of the rate.
+    """
+    if payload.sample_rate is not None:
+        profiler_settings.sample_rate = payload.sample_rate
+    if payload.routes is not None:
+        profiler_settings.routes = set(payload.routes)
+    return profiler_settings.as_dict()
+
+@router.get("/profiler/profiles", response_model=List[ProfileFileRead])
+def get_profiles():
+    """Collapsed-stack files, newest first."""
+    return list_profiles()
+
+@router.get("/profiler/profiles/{name}")
+def download_profile(name: str):
+    """One collapsed-stack file; feed it to flamegraph.pl or speedscope."""
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+@router.get("/queries")
+def get_query_stats():
+    """
+    SQL statements per endpoint since startup (or the last reset): request
+    count, average/max statements per request, DB time and the slowest
+    statement. A high avg_queries is usually an N+1 loop.
+    """
+    return endpoint_query_stats.report()
+
+@router.post("/queries/reset")
+def reset_query_stats():
+    """Clear the per-endpoint aggregates, returning what they held."""
+    report = endpoint_query_stats.report()
+    endpoint_query_stats.reset()
+    return report
+
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+@router.get("/memory", response_model=MemoryStatusRead)
+def get_memory_status():
+    return memory_diagnostics.status()
+
+@router.post("/memory/start", response_model=MemoryStatusRead)
+def start_memory_tracing(payload: MemoryTraceStart):
+    """
+    Start tracemalloc in this worker process. Tracing slows allocation-heavy
+    requests down; stop it when done.
+    """
+    if payload.site_sample_rate is not None:
+        memory_diagnostics.site_sample_rate = payload.site_sample_rate
+    memory_diagnostics.start(payload.frames)
+    return memory_diagnostics.status()
+
+@router.post("/memory/stop", response_model=MemoryStatusRead)
+def stop_memory_tracing():
+    """Stop tracemalloc and drop its snapshots and per-endpoint stats."""
+    memory_diagnostics.stop()
+    return memory_diagnostics.status()
+
+@router.post("/memory/snapshots", response_model=MemorySnapshotRead, status_code=201)
+def take_memory_snapshot(payload: MemorySnapshotCreate):
+    try:
+        return memory_diagnostics.take_snapshot(payload.label)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+@router.get("/memory/snapshots/{snapshot_id}", response_model=List[AllocationSiteRead])
+def get_memory_snapshot_top(
+    snapshot_id: int,
+    group_by: GroupBy = "lineno",
+    limit: int = Query(20, ge=1, le=200),
+):
+    """Call sites holding the most traced memory in a snapshot."""
+    try:
+        return memory_diagnostics.top(snapshot_id, group_by, limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+@router.get("/memory/diff", response_model=List[AllocationSiteRead])
+def diff_memory_snapshots(
+    base: int,
+    other: int,
+    group_by: GroupBy = "lineno",
+    limit: int = Query(20, ge=1, le=200),
+):
+    """Call sites whose allocations grew or shrank most from `base` to `other`."""
+    try:
+        return memory_diagnostics.diff(base, other, group_by, limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+@router.get("/memory/endpoints", response_model=List[EndpointMemoryRead])
+def get_endpoint_memory(limit: int = Query(10, ge=1, le=50)):
+    return memory_diagnostics.endpoint_report(limit)
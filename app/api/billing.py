@@ -1,23 +1,39 @@
 # app/routers/subscriptions.py
 
+import os
 from typing import List, Dict, Optional
 from fastapi import APIRouter, Depends, Request, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import get_db, get_read_db
 from app.models.user import User
+from app.responses import PreSerializedJSONResponse, etag_matches, not_modified
 from app.services.billing_service import billing_service
 from app.schemas.billing import CreateOrderIn, PlanOut, SubscriptionOut, PaymentOut
 from app.services.auth import get_current_user
 
 router = APIRouter()
 
-@router.get("/plans", response_model=List[PlanOut])
+PLANS_CACHE_MAX_AGE = int(os.getenv("PLANS_CACHE_MAX_AGE", "3600"))
+PLANS_CACHE_CONTROL = f"public, max-age={PLANS_CACHE_MAX_AGE}"
+
+@router.get(
+    "/plans",
+    response_model=List[PlanOut],
+    response_class=PreSerializedJSONResponse,
+)
 def list_plans(
-    db: Session = Depends(get_db),
-) -> List[PlanOut]:
+    request: Request,
+    db: Session = Depends(get_read_db),
+):
     """List all available subscription plans."""
-    return billing_service.list_plans(db)
+    body, etag = billing_service.list_plans_payload(db)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, PLANS_CACHE_CONTROL)
+    return PreSerializedJSONResponse(
+        content=body,
+        headers={"ETag": etag, "Cache-Control": PLANS_CACHE_CONTROL},
+    )
 
 @router.post("/trial", response_model=SubscriptionOut)
 def start_trial(
@@ -5,7 +5,7 @@ from uuid import UUID
 from fastapi import APIRouter, Header, Depends
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from app.db import get_db
+from app.db import get_db, get_read_db, mark_primary
 from app.services import onboarding_bot, tutoring_bot
 
 router = APIRouter()
@@ -20,7 +20,10 @@ async def chat_entry(
     body: ChatRequest,
     x_user_id: UUID = Header(...),
     db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
 ):
+    # Both bots save the exchange as memories
+    mark_primary(x_user_id)
     if body.chat_type == "onboarding":
         return await onboarding_bot.handle_onboarding(
             db,
@@ -35,6 +38,7 @@ async def chat_entry(
             x_user_id,
             body.message,
             body.context,
+            read_db=read_db,
         )
 
     return {"error": "Invalid chat_type"}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.db import get_db
+from app.db import get_read_db, read_your_writes
 from app.api.users import get_current_user
 from app.services.dashboard_service import dashboard_service
 from app.schemas.dashboard import DashboardResponse
@@ -10,7 +10,7 @@ router = APIRouter()
 @router.get("", response_model=DashboardResponse)
 def get_dashboard(
     user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    service = dashboard_service(db, user)
+    service = dashboard_service(read_your_writes(db, user.id), user)
     return service.get_dashboard()
\ No newline at end of file
@@ -2,7 +2,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from app.db import get_db
+from app.db import engine_pools, get_db, pool_stats
 
 router = APIRouter()
 
@@ -19,4 +19,21 @@ def health_check(db: Session = Depends(get_db)):
         "service": "GMAT Prep API",
         "version": "1.0.0",
         "database": db_status,
+        "pool": pool_stats.snapshot(),
+    }
+
+@router.get("/pool")
+def pool_health():
+    """
+    Connection pool state for sizing the pool against the worker count:
+    connections in use/idle/overflow, acquisition wait times and checkout
+    failures (timeouts mean requests queued longer than DB_POOL_TIMEOUT).
+    The primary's report is at the top level; each read replica's pool is
+    reported under "replicas".
+    """
+    pools = engine_pools()
+    pool, stats = pools.pop("primary")
+    return {
+        **stats.report(pool),
+        "replicas": {name: stats.report(pool) for name, (pool, stats) in pools.items()},
     }
@@ -0,0 +1,15 @@
+# app/api/metrics.py
+from fastapi import APIRouter, Response
+
+from app.db import engine_pools
+from app.observability.metrics import CONTENT_TYPE, REGISTRY, register_pool_metrics
+
+router = APIRouter()
+
+register_pool_metrics(engine_pools)
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint (text exposition format)."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,31 +1,58 @@
 # ================================
 # File: src/api/questions.py
 # ================================
-from fastapi import APIRouter, HTTPException, Query, Depends, status
-from typing import List, Optional
+import os
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Depends, Request, Response, status
+from typing import List, Literal, Optional
 from uuid import UUID
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from app.db import get_db
+from starlette.concurrency import run_in_threadpool
+from app.db import get_db, get_read_db, mark_primary, read_your_writes
 from app.models.question import Question
+from app.responses import (
+    PreSerializedJSONResponse,
+    etag_matches,
+    make_etag,
+    not_modified,
+)
 from app.schemas.progress import AnswerCreate
 from app.schemas.question import (
     IsDeletedPayload,
-    NextQuestionIdResponse,
+    NextQuestionResponse,
+    QuestionBatchRead,
     QuestionCreate,
+    QuestionDuplicateRead,
+    QuestionFacetsRead,
+    QuestionIngestReport,
     QuestionRead,
     QuestionReadRaw,
+    QuestionSearchHit,
     QuestionSummaryRead,
     QuestionResponse,
     QuestionUpdate,
     SingleQuestionRead,
 )
 from app.services.auth import get_current_user
-from app.services.question_service import question_service
+from app.services.dedup_service import DEDUP_MODE, DedupChecker, dedup_service
+from app.services.question_ingest import DEFAULT_BATCH_SIZE, QuestionIngestor
+from app.services.question_service import DuplicateQuestionsError, question_service
 from app.services.progress_service import progress_service
 from app.services.recommendation_service import recommendation_service
+from app.services.similarity_service import EMBED_ON_INGEST, similarity_service
 
 router = APIRouter()
 
+# Question content rarely changes, so let browsers and the CDN reuse it briefly
+# and revalidate with the ETag afterwards. The editor view always revalidates.
+QUESTION_CACHE_MAX_AGE = int(os.getenv("QUESTION_CACHE_MAX_AGE", "60"))
+QUESTION_CACHE_CONTROL = f"public, max-age={QUESTION_CACHE_MAX_AGE}"
+EDITOR_CACHE_CONTROL = "no-cache"
+
+MAX_BATCH_SIZE = int(os.getenv("QUESTION_BATCH_MAX_SIZE", "50"))
+
+DedupMode = Literal["off", "flag", "reject"]
+
 @router.get("", response_model=List[QuestionSummaryRead])
 def list_questions(
     type: Optional[List[str]] = Query(None),
@@ -36,6 +63,7 @@ def list_questions(
     skip: int = 0,
     limit: int = 20,
     user = Depends(get_current_user),
+    session: Session = Depends(get_read_db),
 ):
     filters = {
         "type": type or [],
@@ -45,70 +73,131 @@ def list_questions(
         "progress_filter": progress_filter,
         "user_id": user.id if user else None,  # only if user authenticated
     }
-    return question_service.get_summaries(filters, skip, limit)
+    # Progress filters must see the user's latest submits
+    if user:
+        read_your_writes(session, user.id)
+    return question_service.get_summaries(filters, session, skip, limit)
 
-@router.get("/{q_id}", response_model=QuestionResponse)
+@router.get("/search", response_model=List[QuestionSearchHit])
+def search_questions(
+    q: str = Query(..., min_length=1),
+    type: Optional[List[str]] = Query(None),
+    tags: Optional[List[str]] = Query(None),
+    minDifficulty: Optional[int] = Query(None, alias="minDifficulty"),
+    maxDifficulty: Optional[int] = Query(None, alias="maxDifficulty"),
+    skip: int = 0,
+    limit: int = Query(20, le=100),
+    session: Session = Depends(get_db),
+):
+    filters = {
+        "type": type or [],
+        "tags": tags or [],
+        "min_difficulty": minDifficulty,
+        "max_difficulty": maxDifficulty,
+    }
+    return question_service.search(q, filters, session=session, skip=skip, limit=limit)
+
+@router.get("/facets", response_model=QuestionFacetsRead)
+def get_question_facets(
+    type: Optional[List[str]] = Query(None),
+    tags: Optional[List[str]] = Query(None),
+    minDifficulty: Optional[int] = Query(None, alias="minDifficulty"),
+    maxDifficulty: Optional[int] = Query(None, alias="maxDifficulty"),
+    session: Session = Depends(get_db),
+):
+    filters = {
+        "type": type or [],
+        "tags": tags or [],
+        "min_difficulty": minDifficulty,
+        "max_difficulty": maxDifficulty,
+    }
+    return question_service.get_facets(filters, session=session)
+
+@router.get("/duplicates", response_model=List[QuestionDuplicateRead])
+def list_duplicate_questions(
+    skip: int = 0,
+    limit: int = Query(50, ge=1, le=500),
+    session: Session = Depends(get_db),
+):
+    """Questions flagged as near-duplicates at ingest or by the dedup scan."""
+    return dedup_service.get_flagged(session, skip=skip, limit=limit)
+
+@router.get("/batch", response_model=QuestionBatchRead)
+def get_questions_batch(
+    ids: List[UUID] = Query(...),
+    session: Session = Depends(get_db),
+):
+    # Drop repeated ids but keep the order the client asked for
+    qids = list(dict.fromkeys(ids))
+    if len(qids) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_SIZE} question ids per batch",
+        )
+
+    questions, parents = question_service.get_questions_with_parents(qids, session=session)
+    found = {q.id for q in questions}
+    return QuestionBatchRead(
+        questions=[question_service.build_single_question(q) for q in questions],
+        parents=[QuestionRead.model_validate(p) for p in parents],
+        missing_ids=[qid for qid in qids if qid not in found],
+    )
+
+@router.get(
+    "/{q_id}",
+    response_model=QuestionResponse,
+    response_class=PreSerializedJSONResponse,
+)
 def get_question(
     q_id: UUID,
-    session: Session = Depends(get_db)
+    request: Request,
+    session: Session = Depends(get_read_db)
 ):
     try:
-        question = question_service.get_question_by_id(q_id, session=session)
-
-        # --- CASE 1: Subquestion inside composite ---
-        if question.parent_id:
-            parent_q = question_service.get_question_by_id(question.parent_id, session=session)
-
-            return SingleQuestionRead(
-                kind="single",
-                id=question.id,
-                type=question.type,
-                content=question.content,
-                options=question.options,
-                answers=question.answers,
-                tags=question.tags,
-                difficulty=question.difficulty,
-                order=question.order or 0,
-                parent_id=question.parent_id,
-                created_at=question.created_at,
-                updated_at=question.updated_at,
-                is_deleted=question.is_deleted,
-                extras=question.extras,
-                parent=parent_q
-            )
-
-        # --- CASE 2: Standalone question ---
-        return SingleQuestionRead(
-            kind="single",
-            id=question.id,
-            type=question.type,
-            content=question.content,
-            options=question.options,
-            answers=question.answers,
-            tags=question.tags,
-            difficulty=question.difficulty,
-            order=question.order or 0,
-            parent_id=question.parent_id,
-            created_at=question.created_at,
-            updated_at=question.updated_at,
-            is_deleted=question.is_deleted,
-            extras=question.extras,
-            parent=None
-        )
-
+        version = question_service.get_question_version(q_id, session=session)
     except KeyError:
         raise HTTPException(status_code=404, detail="Question not found")
 
-@router.post("/{q_id}/submit", response_model=NextQuestionIdResponse, status_code=status.HTTP_200_OK)
+    # The version stamp comes from a narrow updated_at query, so a matching
+    # If-None-Match is answered without loading the question itself.
+    etag = make_etag(q_id, *version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, QUESTION_CACHE_CONTROL)
+
+    payload = question_service.get_question_payload(q_id, session=session, version=version)
+    return PreSerializedJSONResponse(
+        content=payload,
+        headers={"ETag": etag, "Cache-Control": QUESTION_CACHE_CONTROL},
+    )
+
+@router.get("/{q_id}/similar", response_model=List[QuestionSummaryRead])
+def get_similar_questions(
+    q_id: UUID,
+    background_tasks: BackgroundTasks,
+    limit: int = Query(5, ge=1, le=50),
+    session: Session = Depends(get_db),
+):
+    similar = similarity_service.get_similar(q_id, session=session)
+    if similar is None:
+        raise HTTPException(status_code=404, detail="Question not indexed for similarity yet")
+    similar_ids, stale = similar
+    if stale:
+        # Serve the stored list; newer questions show up once this has run
+        background_tasks.add_task(similarity_service.refresh_in_background, q_id)
+    return question_service.get_summaries_by_ids(similar_ids[:limit], session=session)
+
+@router.post("/{q_id}/submit", response_model=NextQuestionResponse, status_code=status.HTTP_200_OK)
 def submit_answer(
     q_id: UUID,
     payload: AnswerCreate,
+    include_next: bool = Query(False),
     session: Session = Depends(get_db),
 ):
     progress_service.record(q_id, payload, session=session)
+    mark_primary(payload.user_id)
 
     # Fetch the current question to check if it is part of a composite
-    current_q = question_service.get_question_by_id(q_id, session=session)
+    current_q = question_service.get_question_by_id(q_id, session=session, summary=True)
 
     next_question = None
 
@@ -130,22 +219,149 @@ def submit_answer(
             last_question_id=q_id,
             is_correct=payload.is_correct,
             session=session,
+            full=include_next,
         )
+        parent = None
+        if next_question and include_next and next_question.parent_id:
+            parent = question_service.get_question_by_id(next_question.parent_id, session=session)
+    elif include_next:
+        # Siblings carry summary columns only; the next one still needs its
+        # parent loaded, so load both whole in one query
+        (next_question,), parents = question_service.get_questions_with_parents([next_question.id], session)
+        parent = parents[0] if parents else None
+
+    if not next_question:
+        return NextQuestionResponse(next_question_id=None)
+
+    if not include_next:
+        return NextQuestionResponse(next_question_id=next_question.id)
+
+    return NextQuestionResponse(
+        next_question_id=next_question.id,
+        next_question=question_service.build_single_question(next_question, parent),
+    )
 
-    return NextQuestionIdResponse(next_question_id=next_question.id if next_question else None)
+def _index_in_background(background_tasks: BackgroundTasks, qids: List[UUID]) -> None:
+    # Embeddings need an OpenAI round-trip; compute them after the response is sent
+    if EMBED_ON_INGEST and qids:
+        background_tasks.add_task(similarity_service.index_questions_in_background, qids)
 
 @router.post("", response_model=QuestionRead, status_code=201)
-def create_question(payload: QuestionCreate):
-    return question_service.create(payload)
+def create_question(
+    payload: QuestionCreate,
+    background_tasks: BackgroundTasks,
+    session: Session = Depends(get_db),
+):
+    created = question_service.create(payload, session)
+    _index_in_background(background_tasks, [created.id])
+    return created
 
 @router.post("/bulk", response_model=List[QuestionRead], status_code=201)
 def create_questions_bulk(
     payloads: List[QuestionCreate],
+    background_tasks: BackgroundTasks,
+    dedup: DedupMode = Query(DEDUP_MODE),
     session: Session = Depends(get_db)
 ):
-    created = question_service.create_bulk(payloads, session)
+    try:
+        created = question_service.create_bulk(payloads, session, dedup_mode=dedup)
+    except DuplicateQuestionsError as exc:
+        raise HTTPException(
+            status_code=409,
+            detail=[
+                {"index": index, "duplicate_of": str(m.question_id), "similarity": m.similarity}
+                for index, m in exc.matches
+            ],
+        )
+    _index_in_background(background_tasks, [q.id for q in created])
     return [QuestionRead.from_orm(q) for q in created]
 
+def _dedup_checker(session: Session, mode: str) -> Optional[DedupChecker]:
+    return DedupChecker(session, mode) if mode != "off" else None
+
+async def _ndjson_lines(request: Request):
+    """Yield (line_number, raw_line) pairs from a streamed NDJSON body, skipping blanks."""
+    buffer = b""
+    line_no = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line_no += 1
+            if raw.strip():
+                yield line_no, raw
+    if buffer.strip():
+        yield line_no + 1, buffer
+
+@router.post("/bulk/ndjson", response_model=QuestionIngestReport, status_code=201)
+async def ingest_questions_ndjson(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=10000),
+    trusted: bool = Query(False),
+    dedup: DedupMode = Query(DEDUP_MODE),
+    session: Session = Depends(get_db),
+):
+    """
+    Stream-ingest questions from an application/x-ndjson body, one
+    QuestionCreate per line. Invalid rows are reported and skipped; valid
+    rows are inserted in batches and committed together at the end.
+    """
+    ingestor = QuestionIngestor(session, batch_size=batch_size, dedup=_dedup_checker(session, dedup))
+    results = []
+    batch = []
+    async for item in _ndjson_lines(request):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            # Validation and inserts are blocking; keep them off the event loop
+            results.extend(await run_in_threadpool(ingestor.ingest_json_lines, batch, trusted))
+            batch = []
+    if batch:
+        results.extend(await run_in_threadpool(ingestor.ingest_json_lines, batch, trusted))
+
+    await run_in_threadpool(ingestor.flush)
+    await run_in_threadpool(session.commit)
+    _index_in_background(background_tasks, [r.id for r in results if r.id])
+    return QuestionIngestReport(
+        created=ingestor.created,
+        failed=ingestor.failed,
+        results=results,
+    )
+
+@router.post("/bulk/trusted", response_model=QuestionIngestReport, status_code=201)
+async def ingest_questions_trusted(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=10000),
+    # Not DEDUP_MODE: fingerprinting costs far more per row than this path
+    dedup: DedupMode = Query("off"),
+    session: Session = Depends(get_db),
+):
+    """
+    Fast path for trusted content exports: a JSON array of QuestionCreate
+    rows validated in one pass straight into insert rows. Any invalid row
+    rejects the whole request. Near-duplicates are only checked with an
+    explicit ?dedup=flag or ?dedup=reject.
+    """
+    body = await request.body()
+    ingestor = QuestionIngestor(session, batch_size=batch_size, dedup=_dedup_checker(session, dedup))
+    try:
+        results = await run_in_threadpool(ingestor.ingest_trusted_json, body)
+    except ValidationError as exc:
+        raise HTTPException(
+            status_code=422,
+            detail=exc.errors(include_url=False, include_context=False),
+        )
+
+    await run_in_threadpool(ingestor.flush)
+    await run_in_threadpool(session.commit)
+    _index_in_background(background_tasks, [r.id for r in results if r.id])
+    return QuestionIngestReport(
+        created=ingestor.created,
+        failed=ingestor.failed,
+        results=results,
+    )
+
 @router.patch(
     "/{q_id}/isdeleted",
     response_model=SingleQuestionRead,
@@ -161,25 +377,37 @@ def update_question_isdeleted(
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
 
-    # update flag
-    question.is_deleted = payload.is_deleted
-    session.add(question)
-    session.commit()
-    session.refresh(question)
-
-    return question
+    # update flag (cascades to a composite's subquestions)
+    return question_service.set_deleted(question, payload.is_deleted, session)
 
 @router.get("/update/{question_id}", response_model=QuestionReadRaw)
-def get_question(question_id: UUID, db: Session = Depends(get_db)):
+def get_question(
+    question_id: UUID,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+):
+    try:
+        updated_at, _, _ = question_service.get_question_version(question_id, session=db)
+    except KeyError:
+        raise HTTPException(404, "Question not found")
+
+    etag = make_etag("raw", question_id, updated_at)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, EDITOR_CACHE_CONTROL)
+
     q = db.query(Question).get(question_id)
     if not q:
         raise HTTPException(404, "Question not found")
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = EDITOR_CACHE_CONTROL
     return q
 
 @router.patch("/update/{question_id}", response_model=QuestionReadRaw)
 def update_question(
     question_id: UUID,
     payload: QuestionUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ):
     q = db.query(Question).filter(Question.id == question_id).first()
@@ -187,9 +415,11 @@ def update_question(
         raise HTTPException(404, "Question not found")
 
     # only update provided fields
-    for key, val in payload.dict(exclude_unset=True).items():
-        setattr(q, key, val)
-
-    db.commit()
-    db.refresh(q)
+    changes = payload.dict(exclude_unset=True)
+    q = question_service.update(q, changes, db)
+    if "content" in changes or "options" in changes:
+        _index_in_background(background_tasks, [q.id])
+    if changes.keys() & {"content", "options", "parent_id"}:
+        dedup_service.refresh(q, db)
+        db.commit()
     return q
\ No newline at end of file
@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
 from datetime import date
 
-from app.db import get_db
+from app.db import get_db, mark_primary
 from app.models.user import User
 from app.models.profile import UserProfile
 from app.services.auth import get_current_user
@@ -76,6 +76,7 @@ def update_basic(
     session.add(user)
     session.add(profile)
     session.commit()
+    mark_primary(user.id)
     return {"success": True}
 
 @router.put("/display")
@@ -88,6 +89,7 @@ def update_display(
     profile.dark_mode = settings.dark_mode
     session.add(profile)
     session.commit()
+    mark_primary(user.id)
     return {"success": True}
 
 @router.get("/notifications", response_model=NotificationSettings)
@@ -109,4 +111,5 @@ def update_notifications(
     profile.notify_whatsapp = settings.notify_whatsapp
     session.add(profile)
     session.commit()
+    mark_primary(user.id)
     return {"success": True}
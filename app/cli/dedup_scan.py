@@ -0,0 +1,54 @@
+# app/cli/dedup_scan.py
+"""
+Scan the question bank for near-duplicates.
+
+Fingerprints every live top-level question (oldest first) and flags each
+one that near-duplicates an earlier question, via LSH buckets rather than
+pairwise comparison. Results are stored in question_fingerprints and are
+listed by GET /api/questions/duplicates.
+
+    python -m app.cli.dedup_scan                  # flag duplicates
+    python -m app.cli.dedup_scan --dry-run        # report only
+    python -m app.cli.dedup_scan --rebuild        # recompute stored signatures
+"""
+import argparse
+import sys
+import time
+
+from sqlalchemy.orm import configure_mappers
+
+from app.db import session_scope
+import app.models  # noqa: F401  (registers every mapped class)
+from app.services.dedup_service import DEDUP_THRESHOLD, dedup_service
+
+
+def main() -> int:
+    configure_mappers()
+    parser = argparse.ArgumentParser(description="Flag near-duplicate questions.")
+    parser.add_argument("--threshold", type=float, default=DEDUP_THRESHOLD, help="estimated Jaccard similarity to flag at")
+    parser.add_argument("--rebuild", action="store_true", help="recompute fingerprints instead of reusing stored ones")
+    parser.add_argument("--batch-size", type=int, default=1000, help="questions per page/transaction")
+    parser.add_argument("--dry-run", action="store_true", help="print duplicates without storing anything")
+    parser.add_argument("--max-print", type=int, default=50, help="how many duplicate pairs to print")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with session_scope() as db:
+        scanned, flagged = dedup_service.scan_bank(
+            db,
+            threshold=args.threshold,
+            rebuild=args.rebuild,
+            batch_size=args.batch_size,
+            dry_run=args.dry_run,
+        )
+
+    for qid, match in flagged[: args.max_print]:
+        print(f"{qid} ~ {match.question_id} ({match.similarity:.2f})")
+    if len(flagged) > args.max_print:
+        print(f"... and {len(flagged) - args.max_print} more")
+    print(f"scanned {scanned} questions, {len(flagged)} near-duplicates in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+# app/cli/import_questions.py
+"""
+Offline question importer.
+
+Reads a JSON array, NDJSON or CSV dump of QuestionCreate rows from disk,
+validates it in a process pool and bulk-inserts it with the same composite
+grouping rules as POST /api/questions/bulk.
+
+    python -m app.cli.import_questions questions.ndjson --workers 8
+
+CSV dumps use one column per QuestionCreate field; content, options,
+answers and extras hold JSON, tags holds a JSON array or a "|"-separated list.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import configure_mappers
+
+from app.db import session_scope
+import app.models  # noqa: F401  (registers every mapped class)
+from app.schemas.question import QuestionCreate
+from app.services.dedup_service import DEDUP_MODE, DEDUP_MODES, DedupChecker
+from app.services.question_ingest import (
+    DEFAULT_BATCH_SIZE,
+    QuestionIngestor,
+    format_validation_error,
+    trusted_row_adapter,
+)
+
+JSON_COLUMNS = {"content", "options", "answers", "extras"}
+
+# (line, validated payload dict or None, error or None, declared type or None)
+Validated = Tuple[int, Optional[Dict[str, Any]], Optional[str], Optional[str]]
+
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".ndjson", ".jsonl"):
+        return "ndjson"
+    if ext == ".csv":
+        return "csv"
+    return "json"
+
+
+def _csv_row_to_payload(row: Dict[str, str]) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {}
+    for key, value in row.items():
+        if key is None or value is None or value == "":
+            continue
+        if key in JSON_COLUMNS:
+            payload[key] = json.loads(value)
+        elif key == "tags":
+            payload[key] = json.loads(value) if value.startswith("[") else value.split("|")
+        else:
+            payload[key] = value
+    return payload
+
+
+def read_rows(path: str, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Yield (line/row number, raw item). NDJSON lines stay as bytes so parsing
+    happens in the workers; JSON arrays and CSV rows are yielded as dicts.
+    """
+    if fmt == "ndjson":
+        with open(path, "rb") as fh:
+            for line_no, raw in enumerate(fh, start=1):
+                if raw.strip():
+                    yield line_no, raw
+    elif fmt == "csv":
+        with open(path, newline="", encoding="utf-8") as fh:
+            # Row numbers count the header as line 1
+            for line_no, row in enumerate(csv.DictReader(fh), start=2):
+                try:
+                    yield line_no, _csv_row_to_payload(row)
+                except ValueError as exc:
+                    yield line_no, {"__error__": f"invalid JSON column: {exc}", "type": row.get("type")}
+    else:
+        with open(path, "rb") as fh:
+            data = json.load(fh)
+        if not isinstance(data, list):
+            raise SystemExit(f"{path}: expected a JSON array of questions")
+        for index, item in enumerate(data, start=1):
+            yield index, item
+
+
+def _declared_type(item: Any) -> Optional[str]:
+    if isinstance(item, (bytes, str)):
+        try:
+            item = json.loads(item)
+        except ValueError:
+            return None
+    qtype = item.get("type") if isinstance(item, dict) else None
+    return qtype if isinstance(qtype, str) else None
+
+
+def _validate_item(item: Any, trusted: bool) -> Dict[str, Any]:
+    if trusted:
+        if isinstance(item, bytes):
+            return trusted_row_adapter.validate_json(item)
+        return trusted_row_adapter.validate_python(item)
+    if isinstance(item, bytes):
+        return QuestionCreate.model_validate_json(item).model_dump()
+    return QuestionCreate.model_validate(item).model_dump()
+
+
+def validate_chunk(chunk: List[Tuple[int, Any]], trusted: bool = False) -> List[Validated]:
+    """Worker entry point: validate a chunk of raw rows against QuestionCreate."""
+    out: List[Validated] = []
+    for line, item in chunk:
+        if isinstance(item, dict) and "__error__" in item:
+            out.append((line, None, item["__error__"], item.get("type")))
+            continue
+        try:
+            data = _validate_item(item, trusted)
+        except ValidationError as exc:
+            out.append((line, None, format_validation_error(exc), _declared_type(item)))
+            continue
+        out.append((line, data, None, None))
+    return out
+
+
+def _chunks(rows: Iterator[Tuple[int, Any]], size: int) -> Iterator[List[Tuple[int, Any]]]:
+    chunk: List[Tuple[int, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _open_session(dry_run: bool):
+    # Dry runs never open a database session
+    return nullcontext(None) if dry_run else session_scope()
+
+
+def run_import(args: argparse.Namespace) -> int:
+    configure_mappers()
+    fmt = args.format or detect_format(args.path)
+    rows = read_rows(args.path, fmt)
+
+    started = time.perf_counter()
+    with _open_session(args.dry_run) as session:
+        # Like the /bulk/trusted endpoint, trusted imports skip dedup unless asked
+        dedup_mode = args.dedup or ("off" if args.trusted else DEDUP_MODE)
+        # Without a session (dry run) duplicates are only found within the file
+        dedup = DedupChecker(session, dedup_mode) if dedup_mode != "off" else None
+        ingestor = QuestionIngestor(session, batch_size=args.batch_size, dedup=dedup)
+        validate_secs = 0.0
+
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            # map() keeps chunk order, which composite grouping depends on
+            validate = partial(validate_chunk, trusted=args.trusted)
+            results = pool.map(validate, _chunks(rows, args.chunk_size))
+            while True:
+                wait_start = time.perf_counter()
+                try:
+                    validated = next(results)
+                except StopIteration:
+                    break
+                validate_secs += time.perf_counter() - wait_start
+
+                for line, data, error, qtype in validated:
+                    if data is None:
+                        ingestor.reject(line, error, qtype)
+                    else:
+                        ingestor.add(line, data)
+
+        # Near-duplicates in the last batch are only found when it is flushed
+        ingestor.flush()
+        errors: List[Tuple[int, str]] = sorted(ingestor.errors)
+        if errors and args.fail_on_error:
+            if session is not None:
+                session.rollback()
+            print(f"Aborting: {len(errors)} invalid rows (--fail-on-error)", file=sys.stderr)
+        elif session is not None:
+            session.commit()
+
+    elapsed = time.perf_counter() - started
+    total = ingestor.created + ingestor.failed
+    aborted = bool(errors and args.fail_on_error)
+    # Rows flushed before the rollback were counted as created but aren't in the database
+    created = 0 if aborted and not args.dry_run else ingestor.created
+    for line, error in errors[: args.max_errors]:
+        print(f"line {line}: {error}", file=sys.stderr)
+    if len(errors) > args.max_errors:
+        print(f"... and {len(errors) - args.max_errors} more errors", file=sys.stderr)
+
+    rate = total / elapsed if elapsed else float("inf")
+    action = "validated" if args.dry_run else "imported"
+    if aborted:
+        action = f"aborted: {action}"
+    print(
+        f"{action} {created} questions ({ingestor.flagged} flagged as near-duplicates), "
+        f"{ingestor.failed} rejected, "
+        f"{total} rows in {elapsed:.2f}s ({rate:,.0f} rows/s; "
+        f"{validate_secs:.2f}s waiting on validation, {args.workers} workers)"
+    )
+    return 1 if aborted else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Bulk-import questions from a JSON, NDJSON or CSV dump.")
+    parser.add_argument("path", help="dump file to import")
+    parser.add_argument("--format", choices=["json", "ndjson", "csv"], help="defaults to the file extension")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="validation processes")
+    parser.add_argument("--chunk-size", type=int, default=500, help="rows per validation task")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per INSERT")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, don't touch the database")
+    parser.add_argument("--trusted", action="store_true", help="validate straight to dicts, skipping QuestionCreate models")
+    parser.add_argument(
+        "--dedup", choices=DEDUP_MODES,
+        help="flag or reject near-duplicate questions (default: DEDUP_MODE, or off with --trusted)",
+    )
+    parser.add_argument("--fail-on-error", action="store_true", help="roll back everything if any row is invalid")
+    parser.add_argument("--max-errors", type=int, default=20, help="how many row errors to print")
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(run_import(build_parser().parse_args()))
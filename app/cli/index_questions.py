@@ -0,0 +1,57 @@
+# app/cli/index_questions.py
+"""
+Embed questions for similar-question lookups and refresh stale neighbour lists.
+
+    python -m app.cli.index_questions            # embed anything not indexed yet
+    python -m app.cli.index_questions --all      # re-check every question's text
+    python -m app.cli.index_questions --stale    # only refresh stale top-k lists
+
+Unchanged question text is never re-embedded, so --all is safe to re-run.
+"""
+import argparse
+import sys
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import configure_mappers
+
+from app.db import session_scope
+import app.models  # noqa: F401  (registers every mapped class)
+from app.models.question import Question
+from app.models.question_embedding import QuestionEmbedding
+from app.services.similarity_service import INDEX_CHUNK_SIZE, similarity_service
+
+
+def main() -> int:
+    configure_mappers()
+    parser = argparse.ArgumentParser(description="Index question embeddings.")
+    parser.add_argument("--all", action="store_true", help="consider every question, not just unindexed ones")
+    parser.add_argument("--stale", action="store_true", help="skip embedding; only refresh stale neighbour lists")
+    parser.add_argument("--batch-size", type=int, default=INDEX_CHUNK_SIZE, help="questions per indexing transaction")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    embedded = refreshed = 0
+    with session_scope() as db:
+        if not args.stale:
+            stmt = select(Question.id).order_by(Question.id)
+            if not args.all:
+                indexed = select(QuestionEmbedding.question_id)
+                stmt = stmt.where(~Question.id.in_(indexed))
+            qids = list(db.execute(stmt).scalars())
+            for start in range(0, len(qids), args.batch_size):
+                embedded += similarity_service.index_questions(qids[start:start + args.batch_size], db)
+                print(f"embedded {embedded} / checked {min(start + args.batch_size, len(qids))} of {len(qids)}")
+
+        while True:
+            count = similarity_service.refresh_stale(db, limit=args.batch_size)
+            refreshed += count
+            if count < args.batch_size:
+                break
+
+    print(f"embedded {embedded} questions, refreshed {refreshed} neighbour lists in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,16 @@
+import itertools
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Tuple
+from uuid import UUID
+from cachetools import TTLCache
+from sqlalchemy import Delete, Insert, Update, create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,13 +18,270 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL is not set in the environment variables.")
 
-engine = create_engine(DATABASE_URL, echo=True)
+# Engine and pool settings. Size the pool so that workers x (pool size +
+# overflow) stays under the server's max_connections.
+DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+SQL_ECHO = os.getenv("SQL_ECHO", str(DEBUG)).lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Server-side cap per statement in milliseconds; 0 keeps the server default
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+POOL_WAIT_SAMPLES = 1000
+# Comma-separated read replicas; read-only endpoints use them when set
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+# How long a user's reads stay on the primary after they write, so they
+# never read a replica that hasn't replayed their own write yet
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+
+class PoolStats:
+    """
+    Pool telemetry: running checkout/checkin totals (checked_out is their
+    difference, so a value that keeps climbing under steady load means
+    sessions are not being returned), how long getting a connection took,
+    and how often it failed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._waits: Deque[float] = deque(maxlen=POOL_WAIT_SAMPLES)
+
+    def on_checkout(self, *_) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def on_checkin(self, *_) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self._waits.append(seconds)
+
+    def record_failure(self, exc: Exception) -> None:
+        with self._lock:
+            self.failures += 1
+            if isinstance(exc, PoolTimeoutError):
+                self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checked_out": self.checkouts - self.checkins,
+            }
+
+    def report(self, pool: QueuePool) -> Dict[str, Any]:
+        """Counters plus the pool's live state and connection wait times."""
+        with self._lock:
+            recent = sorted(self._waits)
+            waits = {
+                "count": self.wait_count,
+                "avg_ms": self.wait_total / self.wait_count * 1000 if self.wait_count else 0.0,
+                # Over the last POOL_WAIT_SAMPLES acquisitions
+                "p95_ms": recent[max(int(len(recent) * 0.95) - 1, 0)] * 1000 if recent else 0.0,
+                "max_ms": self.wait_max * 1000,
+            }
+            failures = {"total": self.failures, "timeouts": self.timeouts}
+        return {
+            **self.snapshot(),
+            "pool_size": pool.size(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "timeout_s": DB_POOL_TIMEOUT,
+            "in_use": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "wait": waits,
+            "checkout_failures": failures,
+        }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that times every connection acquisition (queue wait +
+    connect) into `stats`. instrumented_engine() binds the stats on a
+    subclass, so pools recreated after dispose() keep reporting into them.
+    """
+
+    stats: PoolStats = pool_stats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception as exc:
+            self.stats.record_failure(exc)
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return conn
+
+
+connect_args = {}
+if DB_STATEMENT_TIMEOUT_MS:
+    connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+engine_options = dict(
+    echo=SQL_ECHO,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=connect_args,
+)
+
+
+def instrumented_engine(url: str, stats: PoolStats):
+    """Engine whose pool reports checkouts, waits and failures into `stats`."""
+    pool_class = type("InstrumentedQueuePool", (InstrumentedQueuePool,), {"stats": stats})
+    new_engine = create_engine(url, poolclass=pool_class, **engine_options)
+    event.listen(new_engine, "checkout", stats.on_checkout)
+    event.listen(new_engine, "checkin", stats.on_checkin)
+    return new_engine
+
+
+engine = instrumented_engine(DATABASE_URL, pool_stats)
+# Each replica gets its own pool of the same size (and its own share of the
+# replica's max_connections), with its own stats
+replica_pool_stats = [PoolStats() for _ in DATABASE_REPLICA_URLS]
+replica_engines = [
+    instrumented_engine(url, stats) for url, stats in zip(DATABASE_REPLICA_URLS, replica_pool_stats)
+]
+_next_replica = itertools.cycle(replica_engines)
+_replica_lock = threading.Lock()
+
+
+def engine_pools() -> Dict[str, Tuple[QueuePool, PoolStats]]:
+    """Current pool and stats per engine, named as in the db_pool_* metrics."""
+    pools = {"primary": (engine.pool, pool_stats)}
+    for i, (replica, stats) in enumerate(zip(replica_engines, replica_pool_stats)):
+        pools[f"replica{i}"] = (replica.pool, stats)
+    return pools
+
+
+def pick_replica():
+    """Round-robin over the replicas; the primary when there are none."""
+    if not replica_engines:
+        return engine
+    with _replica_lock:
+        return next(_next_replica)
+
+
+class RoutingSession(Session):
+    """
+    Session whose reads go to ``info["read_bind"]`` (a replica) unless it
+    has been pinned to the primary. Flushes and INSERT/UPDATE/DELETE
+    statements always go to the primary, so a stray write from a read
+    endpoint still lands somewhere writable.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            return engine
+        if self.info.get("pinned_primary"):
+            return engine
+        return self.info.get("read_bind", engine)
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, class_=RoutingSession)
 Base = declarative_base()
 
+
+class RecentWriters:
+    """
+    Users who wrote within the last READ_YOUR_WRITES_SECONDS. Per process:
+    with several workers, a read can land on a worker that didn't see the
+    write, so keep the window above the replicas' usual lag.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 100_000):
+        self._lock = threading.Lock()
+        self._users: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def mark(self, user_id: UUID) -> None:
+        with self._lock:
+            self._users[user_id] = True
+
+    def __contains__(self, user_id: UUID) -> bool:
+        with self._lock:
+            return user_id in self._users
+
+
+recent_writers = RecentWriters(READ_YOUR_WRITES_SECONDS)
+
+
+def mark_primary(user_id: UUID) -> None:
+    """Record a write by `user_id`: their reads stay on the primary for a while."""
+    if replica_engines and user_id is not None:
+        recent_writers.mark(user_id)
+
+
+def read_your_writes(session: Session, user_id: UUID) -> Session:
+    """
+    Pin a read session to the primary if `user_id` wrote recently. Call it
+    before the session runs its first query, so one request never mixes
+    replica and primary snapshots.
+    """
+    if user_id is not None and user_id in recent_writers:
+        session.info["pinned_primary"] = True
+    return session
+
 def get_db():
+    """Request-scoped session: rolled back if the request fails, always closed."""
+    db = SessionLocal()
+    try:
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def get_read_db():
+    """
+    get_db for read-only endpoints: the session reads from a replica (the
+    primary when DATABASE_REPLICA_URLS is unset). Endpoints serving a
+    signed-in user's own data call read_your_writes() on it first.
+    """
+    db = ReadSessionLocal(info={"read_bind": pick_replica()})
+    try:
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """get_db for code outside a request: background tasks, CLIs and scripts."""
     db = SessionLocal()
     try:
         yield db
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
@@ -1,6 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import billing, dashboard, health, questions, settings, users, chat
+from app.api import admin, billing, dashboard, health, metrics, questions, settings, users, chat
+from app.observability.memory import MemoryMiddleware
+from app.observability.metrics import MetricsMiddleware
+from app.observability.profiler import ProfilerMiddleware
+from app.observability.query_stats import QueryStatsMiddleware
 
 origins = [
     "http://localhost:5173",
@@ -18,7 +22,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Queries", "X-DB-Time-Ms", "X-DB-Slowest-Ms"],
 )
+# SQL statement count/time per request (GET /api/admin/queries)
+app.add_middleware(QueryStatsMiddleware)
+# Request latency/in-flight for GET /metrics
+app.add_middleware(MetricsMiddleware)
+# Sampled/opt-in request profiling (see /api/admin/profiler)
+app.add_middleware(ProfilerMiddleware)
+# Per-endpoint allocation tracking while tracemalloc is on (see /api/admin/memory)
+app.add_middleware(MemoryMiddleware)
 
 # Include API routers
 app.include_router(health.router, prefix="/api/health")
@@ -28,6 +41,8 @@ app.include_router(chat.router, prefix="/api/chat")
 app.include_router(dashboard.router, prefix="/api/dashboard")
 app.include_router(settings.router, prefix="/api/settings")
 app.include_router(billing.router, prefix="/api/billing")
+app.include_router(admin.router, prefix="/api/admin")
+app.include_router(metrics.router)
 
 @app.get("/")
 async def read_root():
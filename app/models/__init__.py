@@ -0,0 +1,22 @@
+# app/models/__init__.py
+"""
+Importing the package registers every mapped class, so relationships that
+name their target by string resolve. Tools that run without the API (CLIs,
+benchmarks) import it and call sqlalchemy.orm.configure_mappers() instead
+of importing app.main.
+
+chat is left out: only the migrations use it, and its User.chats
+back-reference doesn't exist.
+"""
+from app.models import (  # noqa: F401
+    memory,
+    payment,
+    plan,
+    profile,
+    progress,
+    question,
+    question_embedding,
+    question_fingerprint,
+    subscription,
+    user,
+)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, Integer, String, ForeignKey, TIMESTAMP, func
+from sqlalchemy import Column, Index, Integer, String, ForeignKey, TIMESTAMP, func
 from sqlalchemy.orm import relationship
 from pgvector.sqlalchemy import Vector
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
@@ -7,6 +7,10 @@ from app.db import Base
 
 class UserMemory(Base):
     __tablename__ = "user_memory"
+    __table_args__ = (
+        # Memory lookups are always per user and chat type
+        Index("ix_user_memory_user_id_type", "user_id", "type"),
+    )
 
     id         = Column(PGUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id    = Column(PGUUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -2,30 +2,59 @@
 # File: app/models/question.py
 # =====================================
 import uuid
-from sqlalchemy import Boolean, Column, String, Integer, JSON, TIMESTAMP, func, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID as PGUUID, ARRAY, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, FetchedValue, String, Integer, TIMESTAMP, func, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import UUID as PGUUID, ARRAY, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from app.db import Base
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        # GIN indexes for tag overlap filters and extras containment lookups
+        Index("ix_questions_tags", "tags", postgresql_using="gin"),
+        Index("ix_questions_extras", "extras", postgresql_using="gin"),
+        Index("ix_questions_search_vector", "search_vector", postgresql_using="gin"),
+        # Partial indexes over live rows only, matching the live() scope below
+        Index("ix_questions_live_type_difficulty", "type", "difficulty", postgresql_where=text("NOT is_deleted")),
+        Index("ix_questions_live_parent_id", "parent_id", "order", postgresql_where=text("NOT is_deleted")),
+        Index("ix_questions_live_difficulty", "difficulty", postgresql_where=text("NOT is_deleted")),
+    )
 
     id = Column(PGUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     parent_id = Column(PGUUID(as_uuid=True), ForeignKey("questions.id"), nullable=True, index=True)
     order = Column(Integer, nullable=True)
     type = Column(String, nullable=False, index=True)
-    content = Column(JSON, nullable=False, server_default="[]")
-    options = Column(JSON, nullable=False, server_default="[]")
-    answers = Column(JSON, nullable=False, server_default="{}")
+    content = Column(JSONB, nullable=False, server_default="[]")
+    options = Column(JSONB, nullable=False, server_default="[]")
+    answers = Column(JSONB, nullable=False, server_default="{}")
     tags = Column(ARRAY(String), nullable=False, server_default="{}")
     difficulty = Column(Integer, nullable=False, server_default="1")
     extras = Column(JSONB, nullable=False, server_default='{}')
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     source = Column(String, nullable=True)
-    is_deleted = Column(Boolean, nullable=False, default=False)
+    is_deleted = Column(Boolean, nullable=False, default=False, server_default="false")
+    # Set on subquestions soft-deleted along with their composite parent
+    deleted_with_parent = Column(Boolean, nullable=False, default=False, server_default="false")
     explanation = Column(String, nullable=True)
+    # Denormalized list-view fields, maintained by QuestionService on write
+    preview_text = Column(String, nullable=True)
+    first_subquestion_id = Column(PGUUID(as_uuid=True), nullable=True)
+    # Maintained by the questions_search_vector trigger from content/options text
+    search_vector = deferred(Column(
+        TSVECTOR, nullable=True, server_default=FetchedValue(), server_onupdate=FetchedValue()
+    ))
 
-    children = relationship("Question", back_populates="parent", lazy="selectin", order_by="Question.order")
+    # Loaded on access only; list and recommendation paths never touch it
+    children = relationship("Question", back_populates="parent", lazy="select", order_by="Question.order")
     parent = relationship("Question", back_populates="children", remote_side=[id])
     progress = relationship("UserQuestionProgress", back_populates="question")
+
+
+def live(entity=Question):
+    """
+    WHERE criterion for questions that aren't soft-deleted. Pass an alias
+    to scope it to that alias. Compiles to ``NOT is_deleted`` so the
+    planner can use the ix_questions_live_* partial indexes.
+    """
+    return ~entity.is_deleted
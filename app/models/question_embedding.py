@@ -0,0 +1,24 @@
+# app/models/question_embedding.py
+from sqlalchemy import Column, ForeignKey, Index, String, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PGUUID
+from pgvector.sqlalchemy import Vector
+from app.db import Base
+
+class QuestionEmbedding(Base):
+    __tablename__ = "question_embeddings"
+    __table_args__ = (
+        Index(
+            "ix_question_embeddings_embedding",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
+
+    question_id          = Column(PGUUID(as_uuid=True), ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True)
+    embedding            = Column(Vector(1536), nullable=False)
+    text_hash            = Column(String(64), nullable=False)
+    # Precomputed top-k neighbours, nearest first; NULL refreshed_at marks it stale
+    similar_ids          = Column(ARRAY(PGUUID(as_uuid=True)), nullable=False, server_default="{}")
+    similar_refreshed_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    updated_at           = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
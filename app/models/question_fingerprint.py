@@ -0,0 +1,24 @@
+# app/models/question_fingerprint.py
+from sqlalchemy import BigInteger, Column, Float, ForeignKey, Index, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PGUUID
+from app.db import Base
+
+class QuestionFingerprint(Base):
+    __tablename__ = "question_fingerprints"
+    __table_args__ = (
+        # LSH lookups probe one band at a time (`bands @> ARRAY[band]`). No
+        # pending list: imports probe right after inserting, and every probe
+        # would scan the unmerged entries.
+        Index("ix_question_fingerprints_bands", "bands", postgresql_using="gin", postgresql_with={"fastupdate": "off"}),
+        Index("ix_question_fingerprints_duplicate_of", "duplicate_of"),
+    )
+
+    question_id  = Column(PGUUID(as_uuid=True), ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True)
+    # MinHash signature of the normalized content + option text
+    signature    = Column(ARRAY(BigInteger), nullable=False)
+    # One hash per LSH band of the signature
+    bands        = Column(ARRAY(BigInteger), nullable=False)
+    # Earlier question this one was flagged as a near-duplicate of, if any
+    duplicate_of = Column(PGUUID(as_uuid=True), ForeignKey("questions.id", ondelete="SET NULL"), nullable=True)
+    similarity   = Column(Float, nullable=True)
+    updated_at   = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,321 @@
+# app/observability/memory.py
+"""
+tracemalloc-based allocation tracking, switched on and off at runtime
+through /api/admin/memory (or at startup with MEMORY_TRACE_ON_START).
+
+While tracing:
+
+* named snapshots can be taken, inspected (top call sites) and diffed;
+* every request records how far traced memory peaked above where it
+  started, per endpoint;
+* a sampled share of requests (MEMORY_SITE_SAMPLE_RATE, off by default)
+  is also watched by a background thread that snapshots the request at its
+  high-water mark, so the per-endpoint top call sites include memory that
+  is freed again before the response goes out (e.g. a materialized result
+  set).
+
+Tracing slows allocation-heavy code down noticeably and the peak is
+process-wide, so per-endpoint numbers are exact only when requests don't
+overlap. Snapshots hold the GIL for as long as they take, which grows with
+the number of live traces: sample sparingly, and turn tracing off again
+when done.
+"""
+import itertools
+import os
+import random
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.observability.query_stats import endpoint_name
+
+MEMORY_TRACE_ON_START = os.getenv("MEMORY_TRACE_ON_START", "false").lower() == "true"
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", "10"))
+MEMORY_SITE_SAMPLE_RATE = float(os.getenv("MEMORY_SITE_SAMPLE_RATE", "0"))
+MEMORY_MAX_SNAPSHOTS = 10
+# Polling is best effort: a short-lived spike between two polls is missed
+MEMORY_WATCH_INTERVAL_MS = 5
+# Only re-snapshot a watched request when it has grown this much past its
+# last snapshot, and at most this many times per request
+MEMORY_WATCH_MIN_GROWTH = 1024 * 1024
+MEMORY_WATCH_MAX_SNAPSHOTS = 3
+
+# Allocation sites left out of reports. Matched against grouped statistics
+# rather than with Snapshot.filter_traces, which copies every trace and takes
+# seconds on a large heap.
+_EXCLUDED_FILES = {
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+}
+
+
+def _included(stat: Any) -> bool:
+    # Like filter_traces(all_frames=False): judged by the most recent frame
+    return stat.traceback[-1].filename not in _EXCLUDED_FILES
+
+
+def _statistics(snapshot: tracemalloc.Snapshot, group_by: str) -> List[Any]:
+    return [stat for stat in snapshot.statistics(group_by) if _included(stat)]
+
+
+def _compare(snapshot: tracemalloc.Snapshot, base: tracemalloc.Snapshot, group_by: str) -> List[Any]:
+    return [stat for stat in snapshot.compare_to(base, group_by) if _included(stat)]
+
+
+def _site(stat: Any, group_by: str) -> str:
+    if group_by == "traceback":
+        return " <- ".join(f"{frame.filename}:{frame.lineno}" for frame in reversed(stat.traceback))
+    frame = stat.traceback[0]
+    return frame.filename if group_by == "filename" else f"{frame.filename}:{frame.lineno}"
+
+
+def _stat_row(stat: Any, group_by: str) -> Dict[str, Any]:
+    row = {"site": _site(stat, group_by), "size_kb": stat.size / 1024, "count": stat.count}
+    if hasattr(stat, "size_diff"):
+        row["size_diff_kb"] = stat.size_diff / 1024
+        row["count_diff"] = stat.count_diff
+    return row
+
+
+class _RequestWatch:
+    """Start snapshot of a sampled request and its snapshot at the highest traced size seen."""
+
+    def __init__(self):
+        self.start: Optional[tracemalloc.Snapshot] = None
+        self.peak: Optional[tracemalloc.Snapshot] = None
+        self.peak_size = 0
+        self.snapshots = 0
+
+    def take_start(self) -> None:
+        self.start = tracemalloc.take_snapshot()
+        self.peak_size = tracemalloc.get_traced_memory()[0]
+
+    def poll(self) -> None:
+        if self.snapshots >= MEMORY_WATCH_MAX_SNAPSHOTS:
+            return
+        current = tracemalloc.get_traced_memory()[0]
+        if current - self.peak_size >= MEMORY_WATCH_MIN_GROWTH:
+            self.peak = tracemalloc.take_snapshot()
+            self.peak_size = tracemalloc.get_traced_memory()[0]
+            self.snapshots += 1
+
+
+class MemoryDiagnostics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.site_sample_rate = MEMORY_SITE_SAMPLE_RATE
+        self._ids = itertools.count(1)
+        self._snapshots: "OrderedDict[int, Tuple[Dict[str, Any], tracemalloc.Snapshot]]" = OrderedDict()
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+        self._sites: Dict[str, Dict[str, List[float]]] = defaultdict(dict)
+        self._watches: List[_RequestWatch] = []
+        self._watcher: Optional[threading.Thread] = None
+
+    # -- switching -------------------------------------------------------
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = MEMORY_TRACE_FRAMES) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """Stop tracing and drop everything collected, snapshots included."""
+        tracemalloc.stop()
+        with self._lock:
+            self._watches.clear()
+            self._snapshots.clear()
+            self._endpoints.clear()
+            self._sites.clear()
+
+    def status(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": self.tracing,
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_kb": current / 1024,
+            "peak_kb": peak / 1024,
+            "tracemalloc_overhead_kb": tracemalloc.get_tracemalloc_memory() / 1024,
+            "site_sample_rate": self.site_sample_rate,
+            "snapshots": self.list_snapshots(),
+        }
+
+    # -- snapshots -------------------------------------------------------
+
+    def take_snapshot(self, label: Optional[str] = None) -> Dict[str, Any]:
+        if not self.tracing:
+            raise RuntimeError("tracemalloc is not tracing; start it first")
+        snapshot = tracemalloc.take_snapshot()
+        with self._lock:
+            snapshot_id = next(self._ids)
+            info = {
+                "id": snapshot_id,
+                "label": label,
+                "taken_at": datetime.now(timezone.utc),
+                "traced_kb": sum(stat.size for stat in _statistics(snapshot, "filename")) / 1024,
+            }
+            self._snapshots[snapshot_id] = (info, snapshot)
+            while len(self._snapshots) > MEMORY_MAX_SNAPSHOTS:
+                self._snapshots.popitem(last=False)
+        return info
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [info for info, _ in self._snapshots.values()]
+
+    def _get(self, snapshot_id: int) -> tracemalloc.Snapshot:
+        with self._lock:
+            if snapshot_id not in self._snapshots:
+                raise KeyError(snapshot_id)
+            return self._snapshots[snapshot_id][1]
+
+    def top(self, snapshot_id: int, group_by: str = "lineno", limit: int = 20) -> List[Dict[str, Any]]:
+        stats = _statistics(self._get(snapshot_id), group_by)
+        return [_stat_row(stat, group_by) for stat in stats[:limit]]
+
+    def diff(self, base_id: int, snapshot_id: int, group_by: str = "lineno", limit: int = 20) -> List[Dict[str, Any]]:
+        """Call sites whose allocations changed most from `base_id` to `snapshot_id`."""
+        stats = _compare(self._get(snapshot_id), self._get(base_id), group_by)
+        return [_stat_row(stat, group_by) for stat in stats[:limit]]
+
+    # -- per request -----------------------------------------------------
+
+    def begin_request(self) -> Optional[Tuple[int, Optional[_RequestWatch]]]:
+        """
+        Cheap enough for the event loop. A sampled request gets a watch
+        without snapshots yet; start_watch() takes the start snapshot and
+        should run in the threadpool.
+        """
+        if not self.tracing:
+            return None
+        tracemalloc.reset_peak()
+        watch = None
+        if self.site_sample_rate > 0 and random.random() < self.site_sample_rate:
+            watch = _RequestWatch()
+        return tracemalloc.get_traced_memory()[0], watch
+
+    def start_watch(self, watch: _RequestWatch) -> None:
+        try:
+            watch.take_start()
+        except RuntimeError:
+            # Tracing was stopped in the meantime
+            return
+        self._watch(watch)
+
+    def end_request(self, scope: Dict[str, Any], token: Tuple[int, Optional[_RequestWatch]]) -> None:
+        if not self.tracing:
+            return
+        start, watch = token
+        current, peak = tracemalloc.get_traced_memory()
+        endpoint = endpoint_name(scope)
+        with self._lock:
+            agg = self._endpoints.setdefault(endpoint, {"requests": 0, "peak_total": 0, "peak_max": 0, "retained": 0})
+            agg["requests"] += 1
+            agg["peak_total"] += peak - start
+            agg["peak_max"] = max(agg["peak_max"], peak - start)
+            agg["retained"] += current - start
+            if watch in self._watches:
+                self._watches.remove(watch)
+        if watch is not None and watch.start is not None and watch.peak is not None:
+            self._add_sites(endpoint, watch)
+
+    def _add_sites(self, endpoint: str, watch: _RequestWatch) -> None:
+        sites = _compare(watch.peak, watch.start, "lineno")
+        with self._lock:
+            totals = self._sites[endpoint]
+            for stat in sites[:50]:
+                if stat.size_diff <= 0:
+                    break
+                site = _site(stat, "lineno")
+                entry = totals.setdefault(site, [0, 0, 0])
+                entry[0] += 1
+                entry[1] += stat.size_diff
+                entry[2] = max(entry[2], stat.size_diff)
+
+    def _watch(self, watch: _RequestWatch) -> None:
+        with self._lock:
+            self._watches.append(watch)
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._run_watcher, name="memory-watch", daemon=True)
+                self._watcher.start()
+
+    def _run_watcher(self) -> None:
+        while True:
+            with self._lock:
+                watches = list(self._watches)
+                if not watches or not self.tracing:
+                    self._watcher = None
+                    return
+            try:
+                for watch in watches:
+                    watch.poll()
+            except RuntimeError:
+                # Tracing was stopped between the check and the snapshot
+                continue
+            time.sleep(MEMORY_WATCH_INTERVAL_MS / 1000)
+
+    def endpoint_report(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Per endpoint: how far traced memory peaked above the request's
+        starting point (avg/max) and what stayed allocated afterwards, plus
+        the call sites allocating most at the peak of sampled requests.
+        """
+        with self._lock:
+            rows = []
+            for endpoint, agg in self._endpoints.items():
+                sites = sorted(self._sites.get(endpoint, {}).items(), key=lambda item: item[1][1], reverse=True)
+                rows.append({
+                    "endpoint": endpoint,
+                    "requests": agg["requests"],
+                    "avg_peak_kb": agg["peak_total"] / agg["requests"] / 1024,
+                    "max_peak_kb": agg["peak_max"] / 1024,
+                    "avg_retained_kb": agg["retained"] / agg["requests"] / 1024,
+                    "top_sites": [
+                        {
+                            "site": site,
+                            "sampled_requests": seen,
+                            "avg_kb": total / seen / 1024,
+                            "max_kb": largest / 1024,
+                        }
+                        for site, (seen, total, largest) in sites[:limit]
+                    ],
+                })
+        return sorted(rows, key=lambda row: row["max_peak_kb"], reverse=True)
+
+
+memory_diagnostics = MemoryDiagnostics()
+
+if MEMORY_TRACE_ON_START:
+    memory_diagnostics.start()
+
+
+class MemoryMiddleware:
+    """Plain ASGI middleware; a single is_tracing() check when tracing is off."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not memory_diagnostics.tracing:
+            await self.app(scope, receive, send)
+            return
+
+        token = memory_diagnostics.begin_request()
+        if token is not None and token[1] is not None:
+            # Snapshots take a while on a large heap; keep them off the event loop
+            await run_in_threadpool(memory_diagnostics.start_watch, token[1])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if token is not None:
+                # Diffing a sampled request's snapshots is slow; keep it off the event loop
+                await run_in_threadpool(memory_diagnostics.end_request, scope, token)
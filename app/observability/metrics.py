@@ -0,0 +1,361 @@
+# app/observability/metrics.py
+"""
+In-process metrics in the Prometheus text format, served at GET /metrics.
+
+A deliberately small registry (counters, gauges, histograms with labels)
+so a single box can be scraped without extra services or dependencies.
+Values live in the worker process; with several workers, scrape each one
+or expect per-process numbers.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.observability.query_stats import route_template
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upstream API calls are slower than our own handlers
+UPSTREAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples(),
+        ]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def series(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class CallbackMetric(Metric):
+    """
+    Gauge or counter read at scrape time from `collect`, which returns
+    {label values: value}; for values some other object already keeps.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[LabelValues, float]],
+        kind: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self._collect = collect
+
+    def samples(self) -> Iterable[str]:
+        for key, value in sorted(self._collect().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> [per-bucket counts..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted((key, list(series)) for key, series in self._values.items())
+        for key, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(series[-2])}"
+            yield f"{self.name}_count{labels} {series[-1]}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+http_request_duration = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "Time to send the full response, by route template and status code.",
+    ("method", "route", "status"),
+))
+http_requests_in_flight = REGISTRY.register(Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled.",
+))
+openai_request_duration = REGISTRY.register(Histogram(
+    "openai_request_duration_seconds",
+    "OpenAI API call latency.",
+    ("kind", "model"),
+    buckets=UPSTREAM_BUCKETS,
+))
+openai_tokens = REGISTRY.register(Counter(
+    "openai_tokens_total",
+    "Tokens reported by the OpenAI API.",
+    ("kind", "model", "type"),
+))
+razorpay_request_duration = REGISTRY.register(Histogram(
+    "razorpay_request_duration_seconds",
+    "Razorpay API call latency.",
+    ("operation",),
+    buckets=UPSTREAM_BUCKETS,
+))
+cache_lookups = REGISTRY.register(Counter(
+    "cache_lookups_total",
+    "In-process cache lookups by result (hit or miss).",
+    ("cache", "result"),
+))
+
+
+def _cache_hit_ratio() -> Dict[LabelValues, float]:
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), value in cache_lookups.series().items():
+        hits_and_total = totals.setdefault(cache, [0, 0])
+        hits_and_total[1] += value
+        if result == "hit":
+            hits_and_total[0] += value
+    return {(cache,): hits / total for cache, (hits, total) in totals.items() if total}
+
+
+REGISTRY.register(CallbackMetric(
+    "cache_hit_ratio",
+    "Share of cache lookups that hit since startup.",
+    ("cache",),
+    _cache_hit_ratio,
+))
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    cache_lookups.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def track_openai(kind: str, create: Callable[..., Any], **kwargs: Any) -> Any:
+    """
+    Call an OpenAI ``create`` method (kind: "embedding" or "chat"), timing
+    it and counting the tokens from the response's usage block.
+    """
+    model = kwargs.get("model", "")
+    with openai_request_duration.time(kind=kind, model=model):
+        resp = create(**kwargs)
+    usage = getattr(resp, "usage", None)
+    if usage is not None:
+        openai_tokens.inc(getattr(usage, "prompt_tokens", 0) or 0, kind=kind, model=model, type="prompt")
+        completion = getattr(usage, "completion_tokens", 0) or 0
+        if completion:
+            openai_tokens.inc(completion, kind=kind, model=model, type="completion")
+    return resp
+
+
+def register_pool_metrics(pools: Callable[[], Dict[str, Any]]) -> None:
+    """
+    Pool gauges and counters read at scrape time. `pools` maps an engine
+    name to its (QueuePool, PoolStats) pair.
+    """
+
+    def connections() -> Dict[LabelValues, float]:
+        values = {}
+        for name, (pool, _) in pools().items():
+            values[(name, "in_use")] = pool.checkedout()
+            values[(name, "idle")] = pool.checkedin()
+            values[(name, "overflow")] = max(pool.overflow(), 0)
+        return values
+
+    def sizes() -> Dict[LabelValues, float]:
+        return {(name,): pool.size() for name, (pool, _) in pools().items()}
+
+    def checkouts() -> Dict[LabelValues, float]:
+        return {(name,): stats.checkouts for name, (_, stats) in pools().items()}
+
+    def failures() -> Dict[LabelValues, float]:
+        values = {}
+        for name, (_, stats) in pools().items():
+            values[(name, "timeout")] = stats.timeouts
+            values[(name, "error")] = stats.failures - stats.timeouts
+        return values
+
+    def waits() -> Dict[LabelValues, float]:
+        return {(name,): stats.wait_total for name, (_, stats) in pools().items()}
+
+    REGISTRY.register(CallbackMetric(
+        "db_pool_connections", "Pooled connections by state.", ("engine", "state"), connections,
+    ))
+    REGISTRY.register(CallbackMetric(
+        "db_pool_size", "Configured pool size.", ("engine",), sizes,
+    ))
+    REGISTRY.register(CallbackMetric(
+        "db_pool_checkouts_total", "Connections checked out of the pool.", ("engine",),
+        checkouts, kind="counter",
+    ))
+    REGISTRY.register(CallbackMetric(
+        "db_pool_checkout_failures_total",
+        "Failed pool acquisitions; reason=timeout means waiting past DB_POOL_TIMEOUT.",
+        ("engine", "reason"),
+        failures,
+        kind="counter",
+    ))
+    REGISTRY.register(CallbackMetric(
+        "db_pool_wait_seconds_total", "Time spent acquiring pool connections.", ("engine",),
+        waits, kind="counter",
+    ))
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware timing each request up to its last body chunk."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status: Optional[int] = None
+        recorded = False
+
+        def record(code: Any) -> None:
+            nonlocal recorded
+            if not recorded:
+                recorded = True
+                http_request_duration.observe(
+                    time.perf_counter() - start,
+                    method=scope["method"], route=route_template(scope), status=code,
+                )
+
+        async def send_and_time(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            # Background tasks run after this; they shouldn't count as latency
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                record(status)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_and_time)
+        except Exception:
+            record(status or 500)
+            raise
+        finally:
+            http_requests_in_flight.dec()
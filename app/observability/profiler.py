@@ -0,0 +1,272 @@
+# app/observability/profiler.py
+"""
+Opt-in sampling profiler for live requests.
+
+A request is profiled when it carries ``X-Profile: <ADMIN_TOKEN>`` or is
+picked at random (PROFILE_SAMPLE_RATE, optionally limited to some route
+templates). While it runs, a background thread samples the stacks of the
+threads executing its endpoint or dependencies every PROFILE_INTERVAL_MS
+and counts them; at the end the counts are written to PROFILE_DIR as
+collapsed stacks ("frame;frame;frame count"), which flamegraph.pl and
+speedscope read directly.
+
+A thread's stack is credited to the request whose context it is running
+in (the profile is kept in a context variable, which asyncio tasks and the
+threadpool carry along), so concurrent requests to the same route don't mix.
+Only the part from the route's endpoint/dependency code down is kept; time
+spent outside it (routing, response serialization) is not included.
+"""
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import Context, ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.observability.query_stats import route_template
+from app.services.auth import is_admin_token
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+PROFILE_HEADER = "x-profile"
+PROFILE_FILE_SUFFIX = ".collapsed"
+_FILE_NAME = re.compile(r"^[\w.-]+\.collapsed$")
+
+
+class ProfilerSettings:
+    """Runtime-adjustable sampling settings (see PUT /api/admin/profiler)."""
+
+    def __init__(self):
+        self.sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+        routes = os.getenv("PROFILE_ROUTES", "")
+        # Route templates, e.g. "/api/questions/{q_id}/submit"; empty means all
+        self.routes: Set[str] = {r.strip() for r in routes.split(",") if r.strip()}
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "sample_rate": self.sample_rate,
+            "routes": sorted(self.routes),
+            "interval_ms": PROFILE_INTERVAL_MS,
+            "directory": os.path.abspath(PROFILE_DIR),
+        }
+
+
+profiler_settings = ProfilerSettings()
+
+
+def _route_codes(route: Any) -> FrozenSet[Any]:
+    """Code objects of a route's endpoint and all its (sub)dependencies."""
+    codes = set()
+    pending = [getattr(route, "dependant", None)]
+    while pending:
+        dependant = pending.pop()
+        if dependant is None:
+            continue
+        call = dependant.call
+        code = getattr(call, "__code__", None) or getattr(getattr(call, "__call__", None), "__code__", None)
+        if code is not None:
+            codes.add(code)
+        pending.extend(dependant.dependencies)
+    return frozenset(codes)
+
+
+def _frame_label(code: Any) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _running_context(frames: List[Any]) -> Optional[Context]:
+    """The contextvars.Context the innermost of `frames` runs in.
+
+    Context.run() leaves no frame of its own, so look for the caller that
+    holds it: the asyncio handle (``self._context``) on the event loop, or
+    the threadpool worker's ``context`` for sync endpoints and dependencies.
+    """
+    for frame in reversed(frames):
+        f_locals = frame.f_locals
+        context = f_locals.get("context")
+        if not isinstance(context, Context):
+            context = getattr(f_locals.get("self"), "_context", None)
+        if isinstance(context, Context):
+            return context
+    return None
+
+
+class RequestProfile:
+    def __init__(self, scope: Dict[str, Any]):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.dropped = False
+        self._codes: Optional[FrozenSet[Any]] = None
+        # The sampler thread adds while the request thread finishes and writes
+        self._lock = threading.Lock()
+        self._finished: Optional[List[Tuple[str, int]]] = None
+
+    def codes(self) -> Optional[FrozenSet[Any]]:
+        """None until routing has matched the request."""
+        if self._codes is None and "route" in self.scope:
+            if profiler_settings.routes and route_template(self.scope) not in profiler_settings.routes:
+                self.dropped = True
+            self._codes = _route_codes(self.scope["route"])
+        return self._codes
+
+    def add(self, frames: List[Any]) -> None:
+        """`frames` run outermost first; keep the part from the first route frame down."""
+        codes = self.codes()
+        if not codes or self.dropped:
+            return
+        for i, frame in enumerate(frames):
+            if frame.f_code in codes:
+                stack = ";".join(_frame_label(f.f_code) for f in frames[i:])
+                with self._lock:
+                    if self._finished is None:
+                        self.stacks[stack] += 1
+                        self.samples += 1
+                return
+
+    def finish(self) -> None:
+        """Stop counting and keep what was counted so far for write()."""
+        with self._lock:
+            self._finished = self.stacks.most_common()
+
+    def write(self) -> Optional[str]:
+        if not self._finished or self.dropped:
+            return None
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        slug = re.sub(r"[^\w]+", "_", route_template(self.scope)).strip("_") or "root"
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        name = f"{stamp}_{self.scope['method']}_{slug}_{elapsed_ms:.0f}ms{PROFILE_FILE_SUFFIX}"
+        with open(os.path.join(PROFILE_DIR, name), "w") as fh:
+            for stack, count in self._finished:
+                fh.write(f"{stack} {count}\n")
+        _prune_profiles()
+        return name
+
+
+class StackSampler:
+    """One daemon thread sampling for all active profiles; it exits when none are left."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: Set[RequestProfile] = set()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._active.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def stop(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._active.discard(profile)
+        profile.finish()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        interval = PROFILE_INTERVAL_MS / 1000
+        while True:
+            with self._lock:
+                active = list(self._active)
+                if not active:
+                    self._thread = None
+                    return
+            for frames in _thread_stacks(skip=me):
+                context = _running_context(frames)
+                profile = context.get(_current_profile) if context is not None else None
+                if profile in active:
+                    profile.add(frames)
+            time.sleep(interval)
+
+
+def _thread_stacks(skip: int) -> List[List[Any]]:
+    """Every other thread's current stack, outermost frame first."""
+    stacks = []
+    for tid, frame in sys._current_frames().items():
+        if tid == skip:
+            continue
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()
+        stacks.append(frames)
+    return stacks
+
+
+sampler = StackSampler()
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def _prune_profiles() -> None:
+    files = list_profiles()
+    for entry in files[PROFILE_MAX_FILES:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, entry["name"]))
+        except OSError:
+            pass
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Profile files, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    entries = []
+    for name in os.listdir(PROFILE_DIR):
+        if not _FILE_NAME.match(name):
+            continue
+        stat = os.stat(os.path.join(PROFILE_DIR, name))
+        entries.append({
+            "name": name,
+            "bytes": stat.st_size,
+            "created_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+        })
+    return sorted(entries, key=lambda e: e["created_at"], reverse=True)
+
+
+def profile_path(name: str) -> Optional[str]:
+    """Path of a listed profile file; None for unknown or unsafe names."""
+    if not _FILE_NAME.match(name):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
+
+
+def _wants_profile(scope: Dict[str, Any]) -> bool:
+    for key, value in scope.get("headers", ()):
+        if key == PROFILE_HEADER.encode():
+            return is_admin_token(value.decode("latin-1"))
+    rate = profiler_settings.sample_rate
+    return rate > 0 and random.random() < rate
+
+
+class ProfilerMiddleware:
+    """Plain ASGI middleware deciding per request whether to profile it."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope)
+        token = _current_profile.set(profile)
+        sampler.start(profile)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            sampler.stop(profile)
+            _current_profile.reset(token)
+            await run_in_threadpool(profile.write)
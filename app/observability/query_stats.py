@@ -0,0 +1,202 @@
+# app/observability/query_stats.py
+"""
+Per-request SQL statement counts and timings.
+
+Engine cursor events add every statement to the stats of the request that
+issued it (found through a context variable, which FastAPI carries into
+the threadpool running sync endpoints). QueryStatsMiddleware opens the
+stats for each request, adds debug headers, logs requests over
+QUERY_COUNT_WARN statements and folds the result into per-endpoint
+aggregates for GET /api/admin/queries.
+"""
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.db import DEBUG
+
+logger = logging.getLogger(__name__)
+
+# Log a warning when one request runs more statements than this; 0 disables
+QUERY_COUNT_WARN = int(os.getenv("QUERY_COUNT_WARN", "25"))
+# X-DB-* response headers; on by default in debug mode
+QUERY_STATS_HEADERS = os.getenv("QUERY_STATS_HEADERS", str(DEBUG)).lower() == "true"
+STATEMENT_PREVIEW_CHARS = 300
+
+
+class RequestQueryStats:
+    __slots__ = ("count", "total", "slowest", "slowest_sql")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_sql: Optional[str] = None
+
+    def add(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.slowest:
+            self.slowest = seconds
+            self.slowest_sql = statement
+
+    def headers(self) -> List[tuple]:
+        return [
+            (b"x-db-queries", str(self.count).encode()),
+            (b"x-db-time-ms", f"{self.total * 1000:.1f}".encode()),
+            (b"x-db-slowest-ms", f"{self.slowest * 1000:.1f}".encode()),
+        ]
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("query_start")
+    if stats is None or not starts:
+        return
+    stats.add(statement, time.perf_counter() - starts.pop())
+
+
+class EndpointQueryStats:
+    """Running per-endpoint totals of RequestQueryStats."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, endpoint: str, stats: RequestQueryStats) -> None:
+        with self._lock:
+            agg = self._endpoints.get(endpoint)
+            if agg is None:
+                agg = self._endpoints[endpoint] = {
+                    "requests": 0, "queries": 0, "max_queries": 0,
+                    "db_time": 0.0, "slowest": 0.0, "slowest_sql": None,
+                }
+            agg["requests"] += 1
+            agg["queries"] += stats.count
+            agg["max_queries"] = max(agg["max_queries"], stats.count)
+            agg["db_time"] += stats.total
+            if stats.slowest > agg["slowest"]:
+                agg["slowest"] = stats.slowest
+                agg["slowest_sql"] = stats.slowest_sql
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Endpoints by total DB time, heaviest first."""
+        with self._lock:
+            rows = [
+                {
+                    "endpoint": endpoint,
+                    "requests": agg["requests"],
+                    "avg_queries": agg["queries"] / agg["requests"],
+                    "max_queries": agg["max_queries"],
+                    "total_db_ms": agg["db_time"] * 1000,
+                    "avg_db_ms": agg["db_time"] / agg["requests"] * 1000,
+                    "slowest_ms": agg["slowest"] * 1000,
+                    "slowest_statement": _preview(agg["slowest_sql"]),
+                }
+                for endpoint, agg in self._endpoints.items()
+            ]
+        return sorted(rows, key=lambda row: row["total_db_ms"], reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+
+endpoint_query_stats = EndpointQueryStats()
+
+
+def _preview(statement: Optional[str]) -> Optional[str]:
+    if statement is None:
+        return None
+    statement = " ".join(statement.split())
+    if len(statement) > STATEMENT_PREVIEW_CHARS:
+        return statement[:STATEMENT_PREVIEW_CHARS] + "..."
+    return statement
+
+
+# id(route) -> the router prefix it was last matched under
+_route_prefixes: Dict[int, str] = {}
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """
+    Path template of the matched route, e.g. "/api/questions/{q_id}", so
+    ids don't split the stats. FastAPI keeps included routers' routes as
+    they were declared (wrapped, not copied with the prefix), so
+    scope["route"].path_format is only the part below the prefix, e.g.
+    "/{q_id}". The prefix is what precedes the shortest tail of the path
+    the route's pattern matches; it is found once per route and then only
+    checked.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    path = scope["path"]
+    regex = getattr(route, "path_regex", None)
+    if regex is None:
+        return path
+    prefix = _route_prefixes.get(id(route))
+    if prefix is not None and path.startswith(prefix) and regex.match(path[len(prefix):]):
+        return prefix + route.path_format
+    for cut in range(len(path), -1, -1):
+        if (cut == len(path) or path[cut] == "/") and regex.match(path[cut:]):
+            _route_prefixes[id(route)] = path[:cut]
+            return path[:cut] + route.path_format
+    return path
+
+
+def endpoint_name(scope: Dict[str, Any]) -> str:
+    return f"{scope.get('method', '')} {route_template(scope)}"
+
+
+class QueryStatsMiddleware:
+    """Plain ASGI middleware, so the context variable is set in the request's own context."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and QUERY_STATS_HEADERS:
+                message["headers"] = list(message.get("headers", [])) + stats.headers()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current.reset(token)
+            endpoint = endpoint_name(scope)
+            endpoint_query_stats.record(endpoint, stats)
+            if QUERY_COUNT_WARN and stats.count > QUERY_COUNT_WARN:
+                logger.warning(
+                    "%s ran %d SQL statements (%.1f ms in the database); slowest %.1f ms: %s",
+                    endpoint, stats.count, stats.total * 1000, stats.slowest * 1000,
+                    _preview(stats.slowest_sql),
+                )
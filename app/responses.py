@@ -0,0 +1,54 @@
+# app/responses.py
+import hashlib
+from typing import Any, Optional
+
+from fastapi.responses import Response
+
+
+class PreSerializedJSONResponse(Response):
+    """
+    JSON response for bodies that are already serialized to bytes.
+
+    Skips FastAPI's response_model validation and json encoding entirely,
+    so handlers can serve payloads straight out of a cache.
+    """
+    media_type = "application/json"
+
+    def render(self, content: bytes) -> bytes:
+        return content
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag derived from the given version parts (ids, timestamps, hashes)."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag derived from a serialized response body."""
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against our ETag. Per RFC 9110 the
+    comparison for If-None-Match is weak, so W/ prefixes are ignored.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class ProfilerSettingsRead(BaseModel):
+    sample_rate: float
+    routes: List[str]
+    interval_ms: float
+    directory: str
+
+
+class ProfilerSettingsUpdate(BaseModel):
+    sample_rate: Optional[float] = Field(None, ge=0, le=1)
+    # Route templates to sample, e.g. "/api/questions/{q_id}/submit"; [] for all
+    routes: Optional[List[str]] = None
+
+
+class ProfileFileRead(BaseModel):
+    name: str
+    bytes: int
+    created_at: datetime
+
+
+class MemoryTraceStart(BaseModel):
+    frames: int = Field(10, ge=1, le=100)
+    # Share of requests snapshotted at their peak for per-endpoint call sites
+    site_sample_rate: Optional[float] = Field(None, ge=0, le=1)
+
+
+class MemorySnapshotCreate(BaseModel):
+    label: Optional[str] = None
+
+
+class MemorySnapshotRead(BaseModel):
+    id: int
+    label: Optional[str] = None
+    taken_at: datetime
+    traced_kb: float
+
+
+class MemoryStatusRead(BaseModel):
+    tracing: bool
+    frames: int
+    traced_kb: float
+    peak_kb: float
+    tracemalloc_overhead_kb: float
+    site_sample_rate: float
+    snapshots: List[MemorySnapshotRead]
+
+
+class AllocationSiteRead(BaseModel):
+    site: str
+    size_kb: float
+    count: int
+    size_diff_kb: Optional[float] = None
+    count_diff: Optional[int] = None
+
+
+class EndpointAllocationSiteRead(BaseModel):
+    site: str
+    sampled_requests: int
+    avg_kb: float
+    max_kb: float
+
+
+class EndpointMemoryRead(BaseModel):
+    endpoint: str
+    requests: int
+    avg_peak_kb: float
+    max_peak_kb: float
+    avg_retained_kb: float
+    top_sites: List[EndpointAllocationSiteRead]
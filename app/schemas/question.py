@@ -4,8 +4,15 @@
 from datetime import datetime
 from uuid import UUID
 from typing import List, Literal, Optional, Union, Dict, Any
-from typing_extensions import Annotated
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from typing_extensions import Annotated, NotRequired, TypedDict
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    ConfigDict,
+    Field,
+    ValidationInfo,
+    field_validator,
+)
 
 # --- Shared base for ORM-friendly models ---
 class PydanticBase(BaseModel):
@@ -77,6 +84,14 @@ class CellCoordinate(PydanticBase):
     row_index: int
     column_index: int
 
+def check_selected_pairs(v, info: ValidationInfo):
+    qtype = info.context.get("question_type") if info.context else None
+    if qtype == "two-part-analysis" and (not v or len(v) != 2):
+        raise ValueError("Must select exactly 2 cells for two-part analysis")
+    if qtype == "data-sufficiency" and v and len(v) > 2:
+        raise ValueError("At most 2 selections allowed for data-sufficiency")
+    return v
+
 # --- Answer schema ---
 class AnswerSchema(PydanticBase):
     correct_option_id: Optional[str] = None
@@ -86,12 +101,7 @@ class AnswerSchema(PydanticBase):
 
     @field_validator("selected_pairs")
     def validate_pairs(cls, v, info):
-        qtype = info.context.get("question_type") if info.context else None
-        if qtype == "two-part-analysis" and (not v or len(v) != 2):
-            raise ValueError("Must select exactly 2 cells for two-part analysis")
-        if qtype == "data-sufficiency" and v and len(v) > 2:
-            raise ValueError("At most 2 selections allowed for data-sufficiency")
-        return v
+        return check_selected_pairs(v, info)
 
 # --- Base fields shared by create & read ---
 class QuestionBase(PydanticBase):
@@ -150,6 +160,9 @@ class CompositeQuestionRead(PydanticBase):
 
 # --- Summary for list views ---
 class QuestionSummaryRead(PydanticBase):
+    # Services construct these by field name; the alias is for the JSON output
+    model_config = ConfigDict(populate_by_name=True)
+
     id: UUID
     type: str
     difficulty: int
@@ -161,12 +174,74 @@ class QuestionSummaryRead(PydanticBase):
     correct: Optional[bool] = None
     first_subquestion_id: Optional[UUID] = None
 
+# --- Full-text search hit ---
+class QuestionSearchHit(PydanticBase):
+    # Services construct these by field name; the alias is for the JSON output
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: UUID
+    type: str
+    difficulty: int
+    tags: List[str]
+    parent_id: Optional[UUID] = Field(None, alias="parentId")
+    order: Optional[int] = None
+    preview_text: Optional[str] = None
+    headline: Optional[str] = None
+    rank: float
+
+# --- Facet counts for list filters ---
+class FacetCount(PydanticBase):
+    value: str
+    count: int
+
+class DifficultyFacetCount(PydanticBase):
+    value: int
+    count: int
+
+class QuestionFacetsRead(PydanticBase):
+    total: int
+    types: List[FacetCount]
+    difficulties: List[DifficultyFacetCount]
+    tags: List[FacetCount]
+
+# --- Batch fetch for client-side prefetching ---
+class QuestionBatchRead(PydanticBase):
+    # Each question's parent is listed once in `parents` instead of inline
+    questions: List[SingleQuestionRead]
+    parents: List[QuestionRead] = Field(default_factory=list)
+    missing_ids: List[UUID] = Field(default_factory=list)
+
+# --- Streaming bulk ingestion ---
+class IngestRowResult(PydanticBase):
+    line: int
+    status: Literal["created", "error"]
+    id: Optional[UUID] = None
+    parent_id: Optional[UUID] = None
+    error: Optional[str] = None
+    # Set when the row near-duplicates an existing (or earlier) question
+    duplicate_of: Optional[UUID] = None
+    similarity: Optional[float] = None
+
+class QuestionIngestReport(PydanticBase):
+    created: int
+    failed: int
+    results: List[IngestRowResult]
+
+class QuestionDuplicateRead(PydanticBase):
+    question_id: UUID
+    duplicate_of: UUID
+    similarity: float
+
 # --- Response unions ---
 QuestionResponse = Union[SingleQuestionRead, CompositeQuestionRead]
 
 class NextQuestionIdResponse(PydanticBase):
     next_question_id: Optional[UUID]
 
+class NextQuestionResponse(NextQuestionIdResponse):
+    # Only populated when the client opts in with ?include_next=true
+    next_question: Optional[SingleQuestionRead] = None
+
 class IsDeletedPayload(PydanticBase):
     is_deleted: bool
 
@@ -183,3 +258,85 @@ class QuestionUpdate(PydanticBase):
     source:      Optional[str]               = None
 
     model_config = ConfigDict(populate_by_name=True, from_attributes=True)
+
+# --- Dict-shaped mirrors of QuestionCreate for trusted bulk ingest ---
+# Validating against TypedDicts yields plain dicts, so trusted imports can go
+# straight from JSON bytes to insert rows without building and dumping models.
+# Keep these in step with the models above.
+class ParagraphBlockDict(TypedDict):
+    type: Literal["paragraph"]
+    text: str
+    data: NotRequired[Optional[Dict[str, Any]]]
+
+class ImageBlockDict(TypedDict):
+    type: Literal["image"]
+    url: str
+    alt: str
+    data: NotRequired[Optional[Dict[str, Any]]]
+
+class TableBlockDict(TypedDict):
+    type: Literal["table"]
+    headers: List[str]
+    rows: List[List[str]]
+    data: NotRequired[Optional[Dict[str, Any]]]
+
+class MatrixBlockDict(TypedDict):
+    type: Literal["matrix"]
+    headers: List[str]
+    rows: List[List[str]]
+    data: NotRequired[Optional[Dict[str, Any]]]
+
+class DSGridBlockDict(TypedDict):
+    type: Literal["ds_grid"]
+    row_headers: List[str]
+    col_headers: List[str]
+    data: NotRequired[Optional[Dict[str, Any]]]
+
+class GenericBlockDict(TypedDict):
+    type: Literal["list", "dropdown", "numeric"]
+    text: NotRequired[Optional[str]]
+    url: NotRequired[Optional[str]]
+    alt: NotRequired[Optional[str]]
+    headers: NotRequired[Optional[List[str]]]
+    rows: NotRequired[Optional[List[List[str]]]]
+    data: NotRequired[Optional[Dict[str, Any]]]
+
+ContentBlockDict = Annotated[
+    Union[
+        ParagraphBlockDict,
+        ImageBlockDict,
+        TableBlockDict,
+        MatrixBlockDict,
+        DSGridBlockDict,
+        GenericBlockDict
+    ],
+    Field(discriminator="type")
+]
+
+class OptionDict(TypedDict):
+    id: str
+    blocks: List[ContentBlockDict]
+
+class CellCoordinateDict(TypedDict):
+    row_index: int
+    column_index: int
+
+class AnswerDict(TypedDict, total=False):
+    correct_option_id: Optional[str]
+    selected_choice_index: Optional[int]
+    selected_pairs: Annotated[
+        Optional[List[CellCoordinateDict]], AfterValidator(check_selected_pairs)
+    ]
+    clicked_hotspot_id: Optional[str]
+
+class QuestionCreateDict(TypedDict):
+    type: str
+    content: List[ContentBlockDict]
+    options: NotRequired[List[OptionDict]]
+    answers: AnswerDict
+    tags: NotRequired[List[str]]
+    difficulty: NotRequired[Annotated[int, Field(ge=1, le=7)]]
+    extras: NotRequired[Dict[str, Any]]
+    parent_id: NotRequired[Optional[UUID]]
+    order: NotRequired[Optional[int]]
+    source: NotRequired[Optional[str]]
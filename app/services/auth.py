@@ -1,8 +1,10 @@
 # app/services/auth.py
+import hmac
 import os
 from datetime import datetime, timedelta
 from uuid import UUID
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from jose.exceptions import ExpiredSignatureError
@@ -16,6 +18,8 @@ SECRET_KEY      = os.getenv("SECRET_KEY", "your-dev-secret")
 ALGORITHM       = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 1 week
 GOOGLE_CLIENT_ID= os.getenv("GOOGLE_CLIENT_ID")
+# Shared secret for the diagnostics endpoints; unset disables them
+ADMIN_TOKEN     = os.getenv("ADMIN_TOKEN")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/users/login")
 
@@ -58,3 +62,12 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     if not user:
         raise creds_exc
     return user
+
+def is_admin_token(token: Optional[str]) -> bool:
+    # Compare bytes: compare_digest raises TypeError on non-ASCII str input,
+    # and header values can carry any latin-1 character
+    return bool(ADMIN_TOKEN and token and hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")))
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
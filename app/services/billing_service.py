@@ -1,9 +1,11 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import os
+import threading
 from datetime import datetime, timedelta, timezone
 
 import razorpay
 from fastapi import HTTPException
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
 from app.models.payment import Payment
@@ -11,6 +13,9 @@ from app.models.plan import Plan
 from app.models.profile import UserProfile
 from app.models.subscription import Subscription
 from app.models.user import User
+from app.observability.metrics import razorpay_request_duration, record_cache_lookup
+from app.responses import content_etag
+from app.schemas.billing import PlanOut
 
 import requests
 from cachetools import TTLCache, cached
@@ -18,7 +23,14 @@ from cachetools import TTLCache, cached
 # 1-hour cache so you don’t hammer the API
 _rate_cache = TTLCache(maxsize=10, ttl=43200)
 
-@cached(_rate_cache)
+# Plans change only on deploys/admin edits; keep the serialized list around
+PLANS_CACHE_TTL = int(os.getenv("PLANS_CACHE_TTL", "300"))
+_plans_cache = TTLCache(maxsize=1, ttl=PLANS_CACHE_TTL)
+# cachetools caches aren't thread-safe; requests run in the threadpool
+_plans_lock = threading.Lock()
+_plans_adapter = TypeAdapter(List[PlanOut])
+
+@cached(_rate_cache, lock=threading.Lock())
 def get_fx_rate(base: str, quote: str) -> float:
     resp = requests.get(
         "https://api.exchangerate.host/latest",
@@ -63,6 +75,21 @@ class BillingService:
         """Return all available pricing plans."""
         return db.query(Plan).order_by(Plan.price_cents).all()
 
+    def list_plans_payload(self, db: Session) -> Tuple[bytes, str]:
+        """Return the serialized plan list and its content ETag, cached for PLANS_CACHE_TTL."""
+        with _plans_lock:
+            cached_entry = _plans_cache.get("plans")
+        record_cache_lookup("plans", cached_entry is not None)
+        if cached_entry is not None:
+            return cached_entry
+
+        plans = _plans_adapter.validate_python(self.list_plans(db), from_attributes=True)
+        body = _plans_adapter.dump_json(plans)
+        entry = (body, content_etag(body))
+        with _plans_lock:
+            _plans_cache["plans"] = entry
+        return entry
+
     def start_trial(self, user: User, db: Session) -> Subscription:
         """Create a 5-day free trial for the given user, ensuring one trial per user."""
         previous_trial = (
@@ -133,7 +160,8 @@ class BillingService:
         db.commit()
         db.refresh(pending_sub)
 
-        razorpay_order = self.client.order.create(order_data)
+        with razorpay_request_duration.time(operation="order.create"):
+            razorpay_order = self.client.order.create(order_data)
 
         payment = Payment(
             subscription_id=pending_sub.id,
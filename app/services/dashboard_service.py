@@ -3,7 +3,7 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session, aliased
 from app.models.profile import UserProfile
 from app.models.progress import UserQuestionProgress
-from app.models.question import Question
+from app.models.question import Question, live
 from app.schemas.dashboard import (
     StatsSchema, StudyPlanItem, OverallSchema,
     PerformanceDataItem, TopicPerformanceItem, DashboardResponse
@@ -53,7 +53,7 @@ class DashboardService:
         subq = self.session.query(UserQuestionProgress.question_id)\
             .filter_by(user_id=self.user.id).subquery()
         unanswered = self.session.query(Question)\
-            .filter(~Question.id.in_(subq)).limit(4).all()
+            .filter(live(), ~Question.id.in_(subq)).limit(4).all()
         plan = []
         for q in unanswered:
             plan.append(
@@ -95,6 +95,7 @@ class DashboardService:
                 self.session.query(func.count(Question.id))
                 .outerjoin(parent, Question.parent_id == parent.id)
                 .filter(
+                    live(),
                     func.coalesce(parent.type, Question.type).in_(types)
                 )
                 .scalar()
@@ -108,6 +109,7 @@ class DashboardService:
                 .outerjoin(parent, Question.parent_id == parent.id)
                 .filter(
                     UserQuestionProgress.user_id == user_id,
+                    live(),
                     func.coalesce(parent.type, Question.type).in_(types)
                 )
                 .scalar()
@@ -118,11 +120,12 @@ class DashboardService:
 
         # Overall progress
         total_questions = (
-            self.session.query(func.count(Question.id)).scalar() or 1
+            self.session.query(func.count(Question.id)).filter(live()).scalar() or 1
         )
         total_completed = (
             self.session.query(func.count(UserQuestionProgress.id))
-            .filter(UserQuestionProgress.user_id == user_id)
+            .join(Question, Question.id == UserQuestionProgress.question_id)
+            .filter(UserQuestionProgress.user_id == user_id, live())
             .scalar() or 0
         )
         stats['overall'] = int(total_completed / total_questions * 100)
@@ -0,0 +1,355 @@
+# app/services/dedup_service.py
+"""
+Near-duplicate detection for questions.
+
+Each top-level question is reduced to a MinHash signature of the word
+shingles in its normalized content and option text. Signatures are split
+into LSH bands; two questions only get compared when at least one band
+hash matches, so finding duplicates never needs pairwise comparisons over
+the whole bank. Band hashes live in question_fingerprints.bands (GIN) for
+lookups against the bank and in an in-memory LSHIndex within one import.
+Imports look up the bank once per batch, with one query that probes the
+GIN index for each band of the batch's rows.
+
+Subquestions are not fingerprinted: their stems ("Which of the following
+...") only make sense with the passage, which is fingerprinted on the
+composite parent instead.
+"""
+import hashlib
+import os
+import re
+import sys
+import unicodedata
+from array import array
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import BigInteger, bindparam, delete, func, select, true, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, array as pg_array, insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.question import Question, live
+from app.models.question_fingerprint import QuestionFingerprint
+
+NUM_PERM = 120
+LSH_BANDS = 20
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_SIZE = 3
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+# off: no fingerprinting, flag: insert and record duplicate_of, reject: skip duplicates
+DEDUP_MODE = os.getenv("DEDUP_MODE", "off")
+DEDUP_MODES = ("off", "flag", "reject")
+
+# One 32-bit value per permutation from a single SHAKE-128 digest per shingle.
+# Signatures are persisted, so this must never change.
+_DIGEST_SIZE = NUM_PERM * 4
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+class Fingerprint(NamedTuple):
+    signature: List[int]
+    bands: List[int]
+
+
+class DuplicateMatch(NamedTuple):
+    question_id: UUID
+    similarity: float
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def _block_text(block: Any) -> str:
+    if isinstance(block, str):
+        return block
+    if not isinstance(block, dict):
+        return ""
+    parts = [block.get("text") or ""]
+    # Table blocks carry their text in headers/rows
+    parts.extend(block.get("headers") or [])
+    for row in block.get("rows") or []:
+        parts.extend(row)
+    return " ".join(p for p in parts if isinstance(p, str))
+
+
+def _shingles(text: str) -> Set[str]:
+    words = normalize_text(text).split()
+    if not words:
+        return set()
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _permuted(shingle: str) -> array:
+    values = array("I", hashlib.shake_128(shingle.encode()).digest(_DIGEST_SIZE))
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def minhash(shingles: Iterable[str]) -> List[int]:
+    """
+    Column-wise minimum over one row of NUM_PERM hash values per shingle.
+    The rows come from C (hashlib, array) and the minimums from zip/min, so
+    no Python-level arithmetic runs per shingle and permutation.
+    """
+    return [min(column) for column in zip(*map(_permuted, shingles))]
+
+
+def lsh_bands(signature: Sequence[int]) -> List[int]:
+    """One signed 64-bit hash per band (fits a BIGINT), salted with the band number."""
+    packed = array("I", signature)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    packed = packed.tobytes()
+    width = LSH_ROWS * 4
+    bands = []
+    for band in range(LSH_BANDS):
+        data = band.to_bytes(2, "little") + packed[band * width:(band + 1) * width]
+        bands.append(int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little", signed=True))
+    return bands
+
+
+def fingerprint_question(content: Optional[List[Any]], options: Optional[List[Any]]) -> Optional[Fingerprint]:
+    """
+    Fingerprint a question's content and options. Shingles are taken per
+    block/option, so reordered options still fingerprint the same. Returns
+    None for questions with no text to compare.
+    """
+    shingles: Set[str] = set()
+    for block in content or []:
+        shingles |= _shingles(_block_text(block))
+    for opt in options or []:
+        shingles |= _shingles(_block_text(opt))
+    if not shingles:
+        return None
+    signature = minhash(shingles)
+    return Fingerprint(signature, lsh_bands(signature))
+
+
+def estimate_similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity: the share of matching MinHash values."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+class LSHIndex:
+    """In-memory LSH index: band hash -> keys, plus signatures to verify candidates."""
+
+    def __init__(self):
+        self._buckets: Dict[int, List[Any]] = defaultdict(list)
+        self._signatures: Dict[Any, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def add(self, key: Any, fp: Fingerprint) -> None:
+        self._signatures[key] = array("Q", fp.signature)
+        for band in fp.bands:
+            self._buckets[band].append(key)
+
+    def best_match(self, fp: Fingerprint, threshold: float) -> Optional[Tuple[Any, float]]:
+        candidates = {key for band in fp.bands for key in self._buckets.get(band, ())}
+        best = None
+        for key in candidates:
+            score = estimate_similarity(fp.signature, self._signatures[key])
+            if score >= threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
+
+
+class DedupChecker:
+    """
+    Dedup state for one import: matches rows against the bank and against
+    earlier rows of the same import, and queues their fingerprint rows.
+    Call ``load_candidates`` with a batch's fingerprints before matching
+    them; ``flush`` must run after the questions themselves are inserted.
+    """
+
+    def __init__(self, session: Optional[Session], mode: str = DEDUP_MODE, threshold: float = DEDUP_THRESHOLD):
+        self.session = session
+        self.mode = mode
+        self.threshold = threshold
+        self._index = LSHIndex()
+        self._bank = LSHIndex()
+        self._pending: List[Dict[str, Any]] = []
+
+    @property
+    def rejects(self) -> bool:
+        return self.mode == "reject"
+
+    def load_candidates(self, fps: Iterable[Optional[Fingerprint]]) -> None:
+        """Fetch the bank questions that could match any of `fps`, in one query."""
+        fps = [fp for fp in fps if fp is not None]
+        if self.session is None or not fps:
+            self._bank = LSHIndex()
+        else:
+            self._bank = dedup_service.find_candidates(fps, self.session)
+
+    def best_match(self, fp: Optional[Fingerprint]) -> Optional[DuplicateMatch]:
+        """Closest near-duplicate among earlier rows and the loaded bank candidates."""
+        if fp is None:
+            return None
+        match = None
+        for index in (self._index, self._bank):
+            found = index.best_match(fp, self.threshold)
+            if found is not None and (match is None or found[1] > match.similarity):
+                match = DuplicateMatch(*found)
+        return match
+
+    def accept(self, qid: UUID, fp: Optional[Fingerprint], match: Optional[DuplicateMatch]) -> None:
+        """Record an inserted question so later rows can match it."""
+        if fp is None:
+            return
+        self._index.add(qid, fp)
+        self._pending.append(fingerprint_row(qid, fp, match))
+
+    def flush(self) -> None:
+        if self._pending and self.session is not None:
+            dedup_service.store(self._pending, self.session)
+        self._pending = []
+
+
+def fingerprint_row(qid: UUID, fp: Fingerprint, match: Optional[DuplicateMatch]) -> Dict[str, Any]:
+    return {
+        "question_id": qid,
+        "signature": fp.signature,
+        "bands": fp.bands,
+        "duplicate_of": match.question_id if match else None,
+        "similarity": match.similarity if match else None,
+    }
+
+
+class DedupService:
+    def find_candidates(self, fps: Sequence[Fingerprint], session: Session) -> LSHIndex:
+        """Live questions in the bank sharing an LSH band with any of `fps`."""
+        # One GIN probe per band. `bands && :all_bands` would be simpler, but
+        # with a batch's thousands of bands the planner expects it to match
+        # every row and seq-scans, comparing each row against the whole array.
+        band = func.unnest(
+            bindparam("bands", sorted({b for fp in fps for b in fp.bands}), type_=ARRAY(BigInteger))
+        ).table_valued("band").render_derived("b")
+        sharing = (
+            select(QuestionFingerprint.question_id, QuestionFingerprint.signature, QuestionFingerprint.bands)
+            .join(Question, Question.id == QuestionFingerprint.question_id)
+            .where(QuestionFingerprint.bands.contains(pg_array([band.c.band])), live())
+            .lateral()
+        )
+        index = LSHIndex()
+        seen: Set[UUID] = set()
+        for qid, signature, stored_bands in session.execute(select(sharing).select_from(band).join(sharing, true())):
+            # A question comes back once per band it shares
+            if qid not in seen:
+                seen.add(qid)
+                index.add(qid, Fingerprint(signature, stored_bands))
+        return index
+
+    def store(self, rows: List[Dict[str, Any]], session: Session) -> None:
+        stmt = pg_insert(QuestionFingerprint).values(rows)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[QuestionFingerprint.question_id],
+            set_={
+                "signature": stmt.excluded.signature,
+                "bands": stmt.excluded.bands,
+                "duplicate_of": stmt.excluded.duplicate_of,
+                "similarity": stmt.excluded.similarity,
+                "updated_at": datetime.now(timezone.utc),
+            },
+        ))
+
+    def refresh(
+        self, question: Question, session: Session, threshold: float = DEDUP_THRESHOLD
+    ) -> Optional[DuplicateMatch]:
+        """
+        Recompute an edited question's fingerprint and its match against the
+        rest of the bank. Questions without a stored fingerprint are only
+        fingerprinted while dedup is on; subquestions never are. Left for the
+        caller to commit.
+        """
+        had_row = session.execute(
+            delete(QuestionFingerprint).where(QuestionFingerprint.question_id == question.id)
+        ).rowcount
+        if question.parent_id is not None or (not had_row and DEDUP_MODE == "off"):
+            return None
+        fp = fingerprint_question(question.content, question.options)
+        if fp is None:
+            return None
+        best = self.find_candidates([fp], session).best_match(fp, threshold)
+        match = DuplicateMatch(*best) if best else None
+        self.store([fingerprint_row(question.id, fp, match)], session)
+        return match
+
+    def get_flagged(self, session: Session, skip: int = 0, limit: int = 50) -> List[QuestionFingerprint]:
+        """Questions flagged as near-duplicates, most similar first."""
+        stmt = (
+            select(QuestionFingerprint)
+            .where(QuestionFingerprint.duplicate_of != None)
+            .order_by(QuestionFingerprint.similarity.desc(), QuestionFingerprint.question_id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(session.execute(stmt).scalars())
+
+    def scan_bank(
+        self,
+        session: Session,
+        threshold: float = DEDUP_THRESHOLD,
+        rebuild: bool = False,
+        batch_size: int = 1000,
+        dry_run: bool = False,
+    ) -> Tuple[int, List[Tuple[UUID, DuplicateMatch]]]:
+        """
+        Fingerprint every live top-level question, oldest first, and flag
+        each one against the earlier questions it near-duplicates. Stored
+        signatures are reused unless `rebuild`. Commits once per batch;
+        returns (questions scanned, flagged pairs).
+        """
+        index = LSHIndex()
+        flagged: List[Tuple[UUID, DuplicateMatch]] = []
+        scanned = 0
+        last = None
+        while True:
+            stmt = (
+                select(
+                    Question.id, Question.created_at, Question.content, Question.options,
+                    QuestionFingerprint.signature,
+                )
+                .outerjoin(QuestionFingerprint, QuestionFingerprint.question_id == Question.id)
+                .where(Question.parent_id == None, live())
+                .order_by(Question.created_at, Question.id)
+                .limit(batch_size)
+            )
+            if last is not None:
+                stmt = stmt.where(tuple_(Question.created_at, Question.id) > last)
+            rows = session.execute(stmt).all()
+            if not rows:
+                break
+
+            pending = []
+            for qid, _, content, options, signature in rows:
+                if signature and not rebuild:
+                    fp = Fingerprint(list(signature), lsh_bands(signature))
+                else:
+                    fp = fingerprint_question(content, options)
+                if fp is None:
+                    continue
+                best = index.best_match(fp, threshold)
+                match = DuplicateMatch(*best) if best else None
+                if match:
+                    flagged.append((qid, match))
+                index.add(qid, fp)
+                pending.append(fingerprint_row(qid, fp, match))
+
+            scanned += len(rows)
+            last = (rows[-1].created_at, rows[-1].id)
+            if pending and not dry_run:
+                self.store(pending, session)
+                session.commit()
+        return scanned, flagged
+
+
+dedup_service = DedupService()
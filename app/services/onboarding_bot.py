@@ -11,13 +11,16 @@ from sqlalchemy.orm import Session
 from app.models.memory import UserMemory
 from app.models.profile import UserProfile
 from app.models.user import User
+from app.observability.metrics import track_openai
 
 # Initialize OpenAI client
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 
 def get_embedding(text: str) -> List[float]:
-    response = client.embeddings.create(
+    response = track_openai(
+        "embedding",
+        client.embeddings.create,
         input=text,
         model="text-embedding-ada-002"
     )
@@ -155,7 +158,9 @@ async def handle_onboarding(
     # Call the LLM
     memories = fetch_onboarding_memories(db, user_id)
     messages = build_onboarding_prompt(memories, user_input)
-    chat = client.chat.completions.create(
+    chat = track_openai(
+        "chat",
+        client.chat.completions.create,
         model="gpt-4",
         messages=messages,
         temperature=0.7
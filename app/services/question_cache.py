@@ -0,0 +1,48 @@
+# app/services/question_cache.py
+import os
+import threading
+from typing import Any, Hashable, Optional
+from uuid import UUID
+
+from cachetools import LRUCache
+
+from app.observability.metrics import record_cache_lookup
+
+QUESTION_CACHE_SIZE = int(os.getenv("QUESTION_CACHE_SIZE", "5000"))
+
+
+class QuestionPayloadCache:
+    """
+    In-process cache of serialized question payloads.
+
+    Each question id maps to a single (version, payload) pair, where version
+    is whatever the caller uses to detect staleness (e.g. the question's and
+    its parent's updated_at). A lookup with a different version is a miss, and
+    the next fill replaces the stale entry instead of keeping both around.
+    """
+
+    def __init__(self, maxsize: int = QUESTION_CACHE_SIZE):
+        self._entries: LRUCache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def get(self, qid: UUID, version: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(qid)
+        hit = entry is not None and entry[0] == version
+        record_cache_lookup("question_payload", hit)
+        return entry[1] if hit else None
+
+    def set(self, qid: UUID, version: Hashable, payload: Any) -> None:
+        with self._lock:
+            self._entries[qid] = (version, payload)
+
+    def invalidate(self, qid: UUID) -> None:
+        with self._lock:
+            self._entries.pop(qid, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+question_payload_cache = QuestionPayloadCache()
@@ -0,0 +1,266 @@
+# app/services/question_ingest.py
+import json
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple, get_args
+from uuid import UUID
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.question import Question
+from app.schemas.question import (
+    AnswerSchema,
+    DSGridBlock,
+    GenericBlock,
+    ImageBlock,
+    IngestRowResult,
+    MatrixBlock,
+    ParagraphBlock,
+    QuestionCreate,
+    QuestionCreateDict,
+    TableBlock,
+)
+from app.services.dedup_service import DedupChecker, fingerprint_question
+from app.services.question_service import COMPOSITE_TYPES, build_preview_text, question_service
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Reusable adapters for trusted ingest: JSON bytes -> validated plain dicts in
+# one pass, with no QuestionCreate instances to build and dump again.
+trusted_row_adapter = TypeAdapter(QuestionCreateDict)
+trusted_batch_adapter = TypeAdapter(List[QuestionCreateDict])
+
+# Field names of each block type and of answers. TypedDict validation leaves
+# absent optional keys out where model_dump() writes None; question_row
+# fills them in so both paths store the same JSON.
+_BLOCK_DEFAULTS = {
+    block_type: dict.fromkeys(model.model_fields)
+    for model in (ParagraphBlock, ImageBlock, TableBlock, MatrixBlock, DSGridBlock, GenericBlock)
+    for block_type in get_args(model.model_fields["type"].annotation)
+}
+_ANSWER_DEFAULTS = dict.fromkeys(AnswerSchema.model_fields)
+
+
+def format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}"
+        for err in exc.errors(include_url=False)
+    )
+
+
+def _complete(data: Dict[str, Any], defaults: Dict[str, None]) -> Dict[str, Any]:
+    # Validated dicts only hold known keys, so a full-length one is complete
+    if len(data) == len(defaults):
+        return data
+    return {**defaults, **data}
+
+
+def _block_dump(block: Dict[str, Any]) -> Dict[str, Any]:
+    return _complete(block, _BLOCK_DEFAULTS[block["type"]])
+
+
+def question_row(
+    data: Dict[str, Any], qid: UUID, parent_id: Optional[UUID]
+) -> Dict[str, Any]:
+    """
+    Build a questions-table insert row from a validated QuestionCreate
+    payload in dict form: ``QuestionCreate.model_dump()`` or a trusted
+    QuestionCreateDict, which come out the same.
+    """
+    is_composite = data["type"] in COMPOSITE_TYPES
+    content = [_block_dump(block) for block in data["content"]]
+    return {
+        "id": qid,
+        "type": data["type"],
+        "content": content,
+        "preview_text": build_preview_text(content),
+        # Composite parents have no options/answers, same as create_bulk
+        "options": [] if is_composite else [
+            {"id": opt["id"], "blocks": [_block_dump(block) for block in opt["blocks"]]}
+            for opt in data.get("options") or []
+        ],
+        "answers": {} if is_composite else _complete(data.get("answers") or {}, _ANSWER_DEFAULTS),
+        "tags": data.get("tags") or [],
+        "difficulty": data.get("difficulty", 1),
+        "extras": data.get("extras") or {},
+        "parent_id": parent_id,
+        "order": None if is_composite else data.get("order"),
+        "source": data.get("source"),
+        "is_deleted": False,
+    }
+
+
+class QuestionIngestor:
+    """
+    Streaming counterpart of ``QuestionService.create_bulk``.
+
+    Rows are validated one at a time, given client-side UUIDs so composite
+    children can reference their parent without a flush, and written with
+    one executemany INSERT per batch. Nothing is refreshed afterwards; the
+    per-row results carry the assigned ids. Commit is left to the caller;
+    with ``session=None`` rows are validated and grouped but never written.
+
+    With a ``dedup`` checker, top-level rows are matched against the bank
+    and earlier rows when their batch is flushed, with one bank query per
+    batch; near-duplicates are flagged or rejected per its mode by updating
+    the results ``add`` returned. ``errors`` and ``flagged`` are final once
+    the last ``flush`` has run.
+    """
+
+    def __init__(
+        self,
+        session: Optional[Session],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        dedup: Optional[DedupChecker] = None,
+    ):
+        self.session = session
+        self.batch_size = batch_size
+        self.dedup = dedup
+        self.created = 0
+        self.failed = 0
+        self.flagged = 0
+        self.errors: List[Tuple[int, str]] = []
+        self._pending: List[Dict[str, Any]] = []
+        # Results of the queued rows, for dedup to update at flush
+        self._results: List[IngestRowResult] = []
+        self._current_parent: Optional[UUID] = None
+        self._parent_failed_line: Optional[int] = None
+
+    def add(self, line: int, data: Dict[str, Any]) -> IngestRowResult:
+        """Queue one validated payload, resolving composite grouping like create_bulk."""
+        qid = uuid.uuid4()
+
+        if data["type"] in COMPOSITE_TYPES:
+            self._current_parent = qid
+            self._parent_failed_line = None
+            parent_id = None
+        else:
+            parent_id = data.get("parent_id")
+            if parent_id is None and self._parent_failed_line is not None:
+                # The composite this row belongs to was rejected; don't orphan it
+                return self.reject(
+                    line, f"composite parent on line {self._parent_failed_line} was rejected"
+                )
+            if parent_id is None:
+                parent_id = self._current_parent
+
+        result = IngestRowResult(line=line, status="created", id=qid, parent_id=parent_id)
+        self._pending.append(question_row(data, qid, parent_id))
+        if self.dedup is not None:
+            self._results.append(result)
+        self.created += 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        return result
+
+    def reject(self, line: int, error: str, qtype: Optional[str] = None) -> IngestRowResult:
+        if qtype in COMPOSITE_TYPES:
+            self._current_parent = None
+            self._parent_failed_line = line
+        self.failed += 1
+        self.errors.append((line, error))
+        return IngestRowResult(line=line, status="error", error=error)
+
+    def _unqueue(self, result: IngestRowResult, error: str) -> None:
+        # Turn a queued row's result into a rejection
+        self.created -= 1
+        self.failed += 1
+        self.errors.append((result.line, error))
+        result.status = "error"
+        result.error = error
+        result.id = None
+        result.parent_id = None
+
+    def _resolve_duplicates(self) -> None:
+        """
+        Match the queued top-level rows and flag near-duplicates; in reject
+        mode drop them, and the subquestions of a dropped composite.
+        """
+        fps = [
+            fingerprint_question(row["content"], row["options"]) if row["parent_id"] is None else None
+            for row in self._pending
+        ]
+        self.dedup.load_candidates(fps)
+        rejected: Dict[UUID, int] = {}
+        kept = []
+        for row, result, fp in zip(self._pending, self._results, fps):
+            if row["parent_id"] in rejected:
+                self._unqueue(result, f"composite parent on line {rejected[row['parent_id']]} was rejected")
+                continue
+            match = self.dedup.best_match(fp)
+            if match is not None:
+                result.duplicate_of = match.question_id
+                result.similarity = match.similarity
+                if self.dedup.rejects:
+                    self._unqueue(
+                        result,
+                        f"near-duplicate of question {match.question_id} (similarity {match.similarity:.2f})",
+                    )
+                    rejected[row["id"]] = result.line
+                    continue
+                self.flagged += 1
+            self.dedup.accept(row["id"], fp, match)
+            kept.append(row)
+        self._pending = kept
+        self._results = []
+        if self._current_parent in rejected:
+            # Subquestions still to come belong to the rejected composite
+            self._parent_failed_line = rejected[self._current_parent]
+            self._current_parent = None
+
+    def ingest_json_lines(
+        self, lines: Iterable[Tuple[int, bytes]], trusted: bool = False
+    ) -> List[IngestRowResult]:
+        """
+        Validate and queue raw NDJSON lines, returning one result per line.
+        With ``trusted`` each line is validated straight into a dict.
+        """
+        results: List[IngestRowResult] = []
+        for line, raw in lines:
+            try:
+                if trusted:
+                    data = trusted_row_adapter.validate_json(raw)
+                else:
+                    data = QuestionCreate.model_validate_json(raw).model_dump()
+            except ValidationError as exc:
+                results.append(self.reject(line, format_validation_error(exc), _peek_type(raw)))
+                continue
+            results.append(self.add(line, data))
+        return results
+
+    def ingest_trusted_json(self, body: bytes) -> List[IngestRowResult]:
+        """
+        Validate a whole JSON array in one pass and queue every row. Trusted
+        payloads are all-or-nothing: any invalid row raises ValidationError
+        before anything is queued.
+        """
+        rows = trusted_batch_adapter.validate_json(body)
+        return [self.add(line, data) for line, data in enumerate(rows, start=1)]
+
+    def flush(self) -> None:
+        if self.dedup is not None and self._pending:
+            self._resolve_duplicates()
+        if not self._pending:
+            return
+        if self.session is None:
+            self._pending = []
+        else:
+            self.session.execute(insert(Question), self._pending)
+            question_service.refresh_first_subquestions(
+                {row["parent_id"] for row in self._pending}, self.session
+            )
+            self._pending = []
+        if self.dedup is not None:
+            # Fingerprints reference the questions, so they go in second
+            self.dedup.flush()
+
+
+def _peek_type(raw: bytes) -> Optional[str]:
+    # Recover a rejected row's declared type so a broken composite still resets grouping
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return None
+    qtype = data.get("type") if isinstance(data, dict) else None
+    return qtype if isinstance(qtype, str) else None
@@ -1,131 +1,344 @@
 # ==============================================
 # File: src/services/question_service.py
 # ==============================================
-from typing import List, Dict, Any
+import os
+import threading
+import uuid
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from uuid import UUID
-from sqlalchemy import select
-from sqlalchemy.orm import Session
-from app.db import get_db
-from app.models.question import Question
+from cachetools import TTLCache
+from sqlalchemy import func, or_, select, true, tuple_, update
+from sqlalchemy.orm import Session, aliased, load_only
+from app.models.question import Question, live
 from app.models.progress import UserQuestionProgress
+from app.observability.metrics import record_cache_lookup
 from app.schemas.question import (
+    DifficultyFacetCount,
+    FacetCount,
     QuestionCreate,
-    QuestionSummaryRead
+    QuestionFacetsRead,
+    QuestionSearchHit,
+    QuestionSummaryRead,
+    SingleQuestionRead,
 )
-from sqlalchemy import and_
-from typing import Any, Dict, List
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
+from app.services.dedup_service import DedupChecker, DuplicateMatch, fingerprint_question
+from app.services.question_cache import question_payload_cache
+
+# Types that act as composite parents (passage/sources) for the rows after them
+COMPOSITE_TYPES = {"multi-source-reasoning", "reading-comprehension"}
+
+def summary_load():
+    """
+    Loader option for list/navigation/recommendation paths: just the
+    columns they read, never content/options/answers. Full rows are for
+    detail views. (A function so mappers aren't configured at import.)
+    """
+    return load_only(
+        Question.id,
+        Question.type,
+        Question.difficulty,
+        Question.tags,
+        Question.parent_id,
+        Question.order,
+    )
+
+# Facet counts per (filters, bank version); the version check makes entries
+# go stale as soon as a question is added or edited.
+FACETS_CACHE_TTL = int(os.getenv("FACETS_CACHE_TTL", "600"))
+_facets_cache = TTLCache(maxsize=256, ttl=FACETS_CACHE_TTL)
+# cachetools caches aren't thread-safe; requests run in the threadpool
+_facets_lock = threading.Lock()
+
+class DuplicateQuestionsError(ValueError):
+    """Raised by create_bulk in reject mode; matches are (payload index, match) pairs."""
+
+    def __init__(self, matches: List[Tuple[int, DuplicateMatch]]):
+        super().__init__(f"{len(matches)} near-duplicate questions")
+        self.matches = matches
+
+def question_filter_criteria(filters: Dict[str, Any]) -> List[Any]:
+    """WHERE criteria for the type/tag/difficulty filters shared by list views."""
+    criteria = []
+    if filters.get("type"):
+        criteria.append(Question.type.in_(filters["type"]))
+    if filters.get("tags"):
+        criteria.append(Question.tags.overlap(filters["tags"]))
+    if filters.get("min_difficulty") is not None:
+        criteria.append(Question.difficulty >= filters["min_difficulty"])
+    if filters.get("max_difficulty") is not None:
+        criteria.append(Question.difficulty <= filters["max_difficulty"])
+    return criteria
+
+def build_preview_text(content: Optional[List[Any]]) -> Optional[str]:
+    """
+    First paragraph of a question, truncated to 100 characters for list
+    views. Stored in Question.preview_text on write; the
+    question_preview_text() SQL function computes the same thing.
+    """
+    for block in content or []:
+        if isinstance(block, dict) and block.get("type") == "paragraph":
+            txt = block.get("text", "")
+            return txt[:100] + ("..." if len(txt) > 100 else "")
+    return None
+
+def build_summaries(rows: Iterable[Any], user_id: Optional[UUID] = None) -> List[QuestionSummaryRead]:
+    """
+    QuestionSummaryRead per row of summary columns. The attempted/correct
+    progress columns are only read when a user_id is given.
+    """
+    return [
+        QuestionSummaryRead(
+            id=row.id,
+            type=row.type,
+            difficulty=row.difficulty,
+            tags=row.tags,
+            parent_id=row.parent_id,
+            order=row.order,
+            preview_text=row.preview_text,
+            attempted=bool(user_id and row.attempted),
+            correct=row.correct if user_id else None,
+            first_subquestion_id=row.first_subquestion_id,
+        )
+        for row in rows
+    ]
 
 class QuestionService:
 
     def get_summaries(
-        self, filters: Dict[str, Any], skip: int = 0, limit: int = 50
+        self, filters: Dict[str, Any], session: Session, skip: int = 0, limit: int = 50
     ) -> List[QuestionSummaryRead]:
-        # Open a DB session
-        db = next(get_db())
+        """
+        List view of live top-level questions. Only the narrow summary
+        columns are read (preview_text and first_subquestion_id are kept up
+        to date on write), and the user's progress is aggregated in SQL per
+        top-level question, with subquestion attempts counting towards their
+        parent. Filtering and pagination both happen in the database.
+        """
         user_id = filters.get("user_id")
         pf = filters.get("progress_filter", "all")
 
-        # 1) Base query: top-level questions with children eager-loaded
-        query = (
-            db.query(Question)
-            .options(joinedload(Question.children))
-            .filter(Question.parent_id == None)
-        )
+        # 1) Base query: summary columns of live top-level questions
+        stmt = select(
+            Question.id,
+            Question.type,
+            Question.difficulty,
+            Question.tags,
+            Question.parent_id,
+            Question.order,
+            Question.preview_text,
+            Question.first_subquestion_id,
+        ).where(Question.parent_id == None, live(), *question_filter_criteria(filters))
 
-        # 2) Apply simple filters
-        if filters.get("type"):
-            query = query.filter(Question.type.in_(filters["type"]))
-        if filters.get("tags"):
-            query = query.filter(Question.tags.overlap(filters["tags"]))
-        if filters.get("min_difficulty") is not None:
-            query = query.filter(Question.difficulty >= filters["min_difficulty"])
-        if filters.get("max_difficulty") is not None:
-            query = query.filter(Question.difficulty <= filters["max_difficulty"])
-
-        # 3) Execute question fetch
-        questions = query.all()
-
-        # 4) Load all progress rows for this user at once
-        progress_map: Dict[int, List[bool]] = {}
+        # 2) Join per-question progress: attempted if any row exists, correct
+        #    only if every attempted (sub)question was answered correctly
         if user_id:
-            rows = (
-                db.query(UserQuestionProgress)
-                .filter(UserQuestionProgress.user_id == user_id)
-                .all()
-            )
-            for pr in rows:
-                progress_map.setdefault(pr.question_id, []).append(pr.is_correct)
-
-        summaries: List[QuestionSummaryRead] = []
-        for q in questions:
-            # Build preview text
-            preview = None
-            for block in q.content or []:
-                if isinstance(block, dict) and block.get("type") == "paragraph":
-                    txt = block.get("text", "")
-                    preview = txt[:100] + ("..." if len(txt) > 100 else "")
-                    break
-
-            # Determine first subquestion ID
-            first_sub = None
-            if q.children:
-                ordered = sorted(q.children, key=lambda c: (c.order or 0))
-                first_sub = ordered[0].id if ordered else None
-
-            # Compute attempted/correct status
-            leaf_prog = progress_map.get(q.id, [])
-            child_prog = []
-            for c in q.children:
-                child_prog.extend(progress_map.get(c.id, []))
-
-            attempted = bool(leaf_prog or child_prog)
-            if child_prog:
-                correct = all(child_prog)
-            elif leaf_prog:
-                # take the first leaf attempt
-                correct = leaf_prog[0]
-            else:
-                correct = None
-
-            # Apply progress_filter
-            if user_id:
-                if pf == "non-attempted" and attempted:
-                    continue
-                if pf == "attempted" and not attempted:
-                    continue
-                if pf == "correct" and correct is not True:
-                    continue
-                if pf == "incorrect" and correct is not False:
-                    continue
-
-            # Build summary DTO
-            summaries.append(
-                QuestionSummaryRead(
-                    id=q.id,
-                    type=q.type,
-                    difficulty=q.difficulty,
-                    tags=q.tags,
-                    parent_id=q.parent_id,
-                    order=q.order,
-                    preview_text=preview,
-                    attempted=attempted,
-                    correct=correct,
-                    first_subquestion_id=first_sub,
+            answered = aliased(Question)
+            root_id = func.coalesce(answered.parent_id, answered.id)
+            progress = (
+                select(
+                    root_id.label("question_id"),
+                    func.bool_and(UserQuestionProgress.is_correct).label("correct"),
                 )
+                .join(answered, answered.id == UserQuestionProgress.question_id)
+                .where(UserQuestionProgress.user_id == user_id, live(answered))
+                .group_by(root_id)
+                .subquery()
+            )
+            attempted = progress.c.question_id != None
+            stmt = (
+                stmt.add_columns(attempted.label("attempted"), progress.c.correct)
+                .outerjoin(progress, progress.c.question_id == Question.id)
+            )
+
+            # 3) Apply progress_filter
+            if pf == "non-attempted":
+                stmt = stmt.where(progress.c.question_id == None)
+            elif pf == "attempted":
+                stmt = stmt.where(attempted)
+            elif pf == "correct":
+                stmt = stmt.where(progress.c.correct == True)
+            elif pf == "incorrect":
+                stmt = stmt.where(progress.c.correct == False)
+
+        # 4) Paginate in SQL, in a stable order
+        stmt = stmt.order_by(Question.created_at, Question.id).offset(skip).limit(limit)
+
+        return build_summaries(session.execute(stmt), user_id)
+
+    def get_summaries_by_ids(
+        self, qids: List[UUID], session: Session
+    ) -> List[QuestionSummaryRead]:
+        """Progress-free summaries for the given ids, in the given order."""
+        stmt = select(
+            Question.id,
+            Question.type,
+            Question.difficulty,
+            Question.tags,
+            Question.parent_id,
+            Question.order,
+            Question.preview_text,
+            Question.first_subquestion_id,
+        ).where(Question.id.in_(qids), live())
+        rows = {row.id: row for row in session.execute(stmt)}
+        return build_summaries(rows[qid] for qid in qids if qid in rows)
+
+    def refresh_first_subquestions(self, parent_ids: Iterable[Optional[UUID]], session: Session) -> None:
+        """
+        Recompute first_subquestion_id for the given composite parents with
+        one set-based UPDATE. Leaves updated_at alone: the parent's own
+        content didn't change. In-session parent objects are not synced.
+        """
+        parent_ids = {pid for pid in parent_ids if pid is not None}
+        if not parent_ids:
+            return
+        child = aliased(Question)
+        first_child = (
+            select(child.id)
+            .where(child.parent_id == Question.id, live(child))
+            .order_by(func.coalesce(child.order, 0), child.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        session.execute(
+            update(Question)
+            .where(Question.id.in_(parent_ids))
+            .values(first_subquestion_id=first_child, updated_at=Question.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+
+    def get_bank_version(self, session: Session) -> Tuple:
+        """Cheap stamp that changes whenever questions are added or edited."""
+        return tuple(session.execute(
+            select(func.count(Question.id), func.max(Question.updated_at))
+        ).one())
+
+    def get_facets(self, filters: Dict[str, Any], session: Session) -> QuestionFacetsRead:
+        """
+        Counts per tag, type and difficulty for top-level questions matching
+        the filters, computed with one GROUPING SETS query and cached per
+        bank version.
+        """
+        key = (
+            tuple(sorted(filters.get("type") or [])),
+            tuple(sorted(filters.get("tags") or [])),
+            filters.get("min_difficulty"),
+            filters.get("max_difficulty"),
+            self.get_bank_version(session),
+        )
+        with _facets_lock:
+            cached_facets = _facets_cache.get(key)
+        record_cache_lookup("facets", cached_facets is not None)
+        if cached_facets is not None:
+            return cached_facets
+
+        base = (
+            select(Question.id, Question.type, Question.difficulty, Question.tags)
+            .where(Question.parent_id == None, live(), *question_filter_criteria(filters))
+            .subquery()
+        )
+        tag = func.unnest(base.c.tags).table_valued("tag").render_derived(name="t").lateral()
+        stmt = (
+            select(
+                func.grouping(base.c.type).label("by_type"),
+                func.grouping(base.c.difficulty).label("by_difficulty"),
+                func.grouping(tag.c.tag).label("by_tag"),
+                base.c.type,
+                base.c.difficulty,
+                tag.c.tag,
+                func.count(base.c.id.distinct()).label("n"),
             )
+            .select_from(base.outerjoin(tag, true()))
+            .group_by(func.grouping_sets(
+                tuple_(base.c.type),
+                tuple_(base.c.difficulty),
+                tuple_(tag.c.tag),
+                tuple_(),
+            ))
+        )
 
-        db.close()
+        total = 0
+        types, difficulties, tags = [], [], []
+        for row in session.execute(stmt):
+            # grouping(x) is 0 when the row belongs to the grouping set on x
+            if row.by_type == 0:
+                types.append(FacetCount(value=row.type, count=row.n))
+            elif row.by_difficulty == 0:
+                difficulties.append(DifficultyFacetCount(value=row.difficulty, count=row.n))
+            elif row.by_tag == 0:
+                if row.tag is not None:  # untagged questions from the outer join
+                    tags.append(FacetCount(value=row.tag, count=row.n))
+            else:
+                total = row.n
 
-        # 5) Paginate in-memory
-        return summaries[skip : skip + limit]
+        facets = QuestionFacetsRead(
+            total=total,
+            types=sorted(types, key=lambda f: (-f.count, f.value)),
+            difficulties=sorted(difficulties, key=lambda f: f.value),
+            tags=sorted(tags, key=lambda f: (-f.count, f.value)),
+        )
+        with _facets_lock:
+            _facets_cache[key] = facets
+        return facets
 
-    def create(self, payload: QuestionCreate) -> Question:
-        db = next(get_db())
+    def search(
+        self,
+        text_query: str,
+        filters: Dict[str, Any],
+        session: Session,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> List[QuestionSearchHit]:
+        """
+        Ranked full-text search over question content and options, using the
+        trigger-maintained search_vector and its GIN index. Subquestions are
+        searchable too, so hits may be composite children.
+        """
+        tsquery = func.websearch_to_tsquery("english", text_query)
+        rank = func.ts_rank_cd(Question.search_vector, tsquery)
+        headline = func.ts_headline(
+            "english",
+            func.question_block_text(Question.content),
+            tsquery,
+            "MaxFragments=1, MinWords=5, MaxWords=20",
+        )
+        stmt = (
+            select(
+                Question.id,
+                Question.type,
+                Question.difficulty,
+                Question.tags,
+                Question.parent_id,
+                Question.order,
+                Question.preview_text,
+                rank.label("rank"),
+                headline.label("headline"),
+            )
+            .where(Question.search_vector.op("@@")(tsquery), live(), *question_filter_criteria(filters))
+            .order_by(rank.desc(), Question.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return [
+            QuestionSearchHit(
+                id=row.id,
+                type=row.type,
+                difficulty=row.difficulty,
+                tags=row.tags,
+                parent_id=row.parent_id,
+                order=row.order,
+                preview_text=row.preview_text,
+                headline=row.headline,
+                rank=row.rank,
+            )
+            for row in session.execute(stmt)
+        ]
+
+    def create(self, payload: QuestionCreate, session: Session) -> Question:
+        content = [block.model_dump() for block in payload.content]
         obj = Question(
             type=payload.type,
-            content=[block.model_dump() for block in payload.content],
+            content=content,
+            preview_text=build_preview_text(content),
             options=[opt.model_dump() for opt in payload.options],
             answers=payload.answers.model_dump(),
             tags=payload.tags,
@@ -135,28 +348,37 @@ class QuestionService:
             order=payload.order,
             source=payload.source
         )
-        db.add(obj)
-        db.commit()
-        db.refresh(obj)
-        db.close()
+        session.add(obj)
+        if obj.parent_id is not None:
+            session.flush()
+            self.refresh_first_subquestions([obj.parent_id], session)
+        session.commit()
+        session.refresh(obj)
         return obj
 
     def create_bulk(
-        self, payloads: List[QuestionCreate], session: Session
+        self, payloads: List[QuestionCreate], session: Session, dedup_mode: str = "off"
     ) -> List[Question]:
+        """
+        Create questions in order, attaching rows after a composite parent
+        to it. With dedup_mode "flag" or "reject", top-level questions are
+        fingerprinted and matched against the bank and earlier payloads;
+        "reject" raises DuplicateQuestionsError before anything is committed.
+        """
         created_objs: List[Question] = []
-
-        # Define which types are considered composite parents
-        COMPOSITE_TYPES = {"multi-source-reasoning", "reading-comprehension"}
+        dedup = DedupChecker(session, dedup_mode) if dedup_mode != "off" else None
+        duplicates: List[Tuple[int, DuplicateMatch]] = []
 
         current_parent: UUID = None
 
         for payload in payloads:
             # If this is a composite type, create a new parent question
+            content = [block.model_dump() for block in payload.content]
             if payload.type in COMPOSITE_TYPES:
                 obj = Question(
                     type=payload.type,
-                    content=[block.model_dump() for block in payload.content],
+                    content=content,
+                    preview_text=build_preview_text(content),
                     options=[],  # Composite parents have no options
                     answers={},  # Composite parents have no answers
                     tags=payload.tags,
@@ -177,8 +399,10 @@ class QuestionService:
                     payload.parent_id = current_parent
 
                 obj = Question(
+                    id=uuid.uuid4(),  # Known up front so dedup can reference it
                     type=payload.type,
-                    content=[block.model_dump() for block in payload.content],
+                    content=content,
+                    preview_text=build_preview_text(content),
                     options=[opt.model_dump() for opt in payload.options],
                     answers=payload.answers.model_dump(),
                     tags=payload.tags,
@@ -191,6 +415,25 @@ class QuestionService:
                 session.add(obj)
                 created_objs.append(obj)
 
+        if dedup is not None:
+            fps = [
+                fingerprint_question(obj.content, obj.options) if obj.parent_id is None else None
+                for obj in created_objs
+            ]
+            dedup.load_candidates(fps)
+            for index, (obj, fp) in enumerate(zip(created_objs, fps)):
+                match = dedup.best_match(fp)
+                if match is not None:
+                    duplicates.append((index, match))
+                dedup.accept(obj.id, fp, match)
+
+        if duplicates and dedup.rejects:
+            session.rollback()
+            raise DuplicateQuestionsError(duplicates)
+        session.flush()
+        if dedup is not None:
+            dedup.flush()
+        self.refresh_first_subquestions({obj.parent_id for obj in created_objs}, session)
         session.commit()
 
         # Refresh to load the final state from the DB
@@ -199,17 +442,159 @@ class QuestionService:
 
         return created_objs
 
-    def get_question_by_id(self, qid: UUID, session: Session) -> Question:
+    def get_question_by_id(self, qid: UUID, session: Session, summary: bool = False) -> Question:
         stmt = select(Question).where(Question.id == qid)
+        if summary:
+            stmt = stmt.options(summary_load())
         result = session.execute(stmt).scalar_one_or_none()
         if not result:
             raise KeyError(f"Question {qid} not found")
         return result
 
+    def update(self, question: Question, changes: Dict[str, Any], session: Session) -> Question:
+        """
+        Apply a partial edit and keep the denormalized summary fields in
+        step: preview_text when content changes, and first_subquestion_id on
+        the old and new parent when a subquestion moves or is reordered.
+        """
+        old_parent_id = question.parent_id
+        for key, val in changes.items():
+            setattr(question, key, val)
+        if "content" in changes:
+            question.preview_text = build_preview_text(question.content)
+        session.flush()
+        if "parent_id" in changes or "order" in changes:
+            self.refresh_first_subquestions([old_parent_id, question.parent_id], session)
+        session.commit()
+        session.refresh(question)
+        return question
+
+    def set_deleted(self, question: Question, is_deleted: bool, session: Session) -> Question:
+        """
+        Toggle a question's soft-delete flag. Composite parents carry their
+        live subquestions with them, so a deleted passage never leaves live
+        children behind in recommendations or search. Those children are
+        marked deleted_with_parent, and restoring the parent brings back only
+        them; children deleted separately before it stay deleted.
+        """
+        if question.is_deleted == is_deleted:
+            return question
+        question.is_deleted = is_deleted
+        # Deleted or restored on its own now, whatever its parent did before
+        question.deleted_with_parent = False
+        session.flush()
+        if question.parent_id is None:
+            children = (
+                update(Question)
+                .where(Question.parent_id == question.id)
+                .execution_options(synchronize_session="fetch")
+            )
+            if is_deleted:
+                session.execute(
+                    children.where(~Question.is_deleted).values(is_deleted=True, deleted_with_parent=True)
+                )
+            else:
+                session.execute(
+                    children.where(Question.deleted_with_parent).values(is_deleted=False, deleted_with_parent=False)
+                )
+        # A parent's first live subquestion may have just changed
+        self.refresh_first_subquestions([question.parent_id or question.id], session)
+        session.commit()
+        session.refresh(question)
+        return question
+
+    def get_question_version(self, qid: UUID, session: Session) -> Tuple:
+        """
+        Return a cheap version stamp for a question's detail payload:
+        its own updated_at plus its parent's, fetched in a single narrow
+        query that never touches the JSON columns.
+        """
+        parent = aliased(Question)
+        stmt = (
+            select(Question.updated_at, Question.parent_id, parent.updated_at)
+            .outerjoin(parent, Question.parent_id == parent.id)
+            .where(Question.id == qid)
+        )
+        row = session.execute(stmt).one_or_none()
+        if not row:
+            raise KeyError(f"Question {qid} not found")
+        return tuple(row)
+
+    def build_single_question(
+        self, question: Question, parent: Optional[Question] = None
+    ) -> SingleQuestionRead:
+        return SingleQuestionRead(
+            kind="single",
+            id=question.id,
+            type=question.type,
+            content=question.content,
+            options=question.options,
+            answers=question.answers,
+            tags=question.tags,
+            difficulty=question.difficulty,
+            order=question.order or 0,
+            parent_id=question.parent_id,
+            created_at=question.created_at,
+            updated_at=question.updated_at,
+            is_deleted=question.is_deleted,
+            extras=question.extras,
+            parent=parent,
+        )
+
+    def get_question_payload(
+        self, qid: UUID, session: Session, version: Optional[Tuple] = None
+    ) -> bytes:
+        """
+        Serialized SingleQuestionRead JSON for a question (with its parent
+        when it is a composite child). Pydantic validation only runs when the
+        cached payload is missing or stale.
+        """
+        if version is None:
+            version = self.get_question_version(qid, session)
+        payload = question_payload_cache.get(qid, version)
+        if payload is not None:
+            return payload
+
+        question = self.get_question_by_id(qid, session=session)
+        parent = None
+        if question.parent_id:
+            parent = self.get_question_by_id(question.parent_id, session=session)
+
+        payload = self.build_single_question(question, parent).model_dump_json(by_alias=True).encode()
+        question_payload_cache.set(qid, version, payload)
+        return payload
+
+    def get_questions_with_parents(
+        self, qids: List[UUID], session: Session
+    ) -> Tuple[List[Question], List[Question]]:
+        """
+        Load the requested questions plus the parents of any composite
+        children in one IN query. Questions come back in request order;
+        parents are deduplicated, in the order their children first appear.
+        """
+        parent_ids = (
+            select(Question.parent_id)
+            .where(Question.id.in_(qids), Question.parent_id.isnot(None))
+            .scalar_subquery()
+        )
+        stmt = (
+            select(Question)
+            .where(or_(Question.id.in_(qids), Question.id.in_(parent_ids)))
+        )
+        rows = {q.id: q for q in session.execute(stmt).scalars().all()}
+
+        questions = [rows[qid] for qid in qids if qid in rows]
+        wanted_parents = dict.fromkeys(q.parent_id for q in questions if q.parent_id)
+        parents = [rows[pid] for pid in wanted_parents if pid in rows]
+        return questions, parents
+
     def get_subquestions_by_group(self, group_id: UUID, session: Session) -> List[Question]:
+        """Live subquestions of a composite, in order, with summary columns only."""
         stmt = (
             select(Question)
-            .where(Question.parent_id == group_id)
+            .options(summary_load())
+            .where(Question.parent_id == group_id, live())
+            .order_by(Question.order)
         )
         results = session.execute(stmt).scalars().all()
         return results
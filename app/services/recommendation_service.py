@@ -1,43 +1,55 @@
 from uuid import UUID
 from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models.question import Question
+from sqlalchemy import func, select
+from app.models.question import Question, live
 from app.models.progress import UserQuestionProgress
-from app.schemas.question import QuestionRead
+from app.services.question_service import summary_load
+from app.services.similarity_service import similarity_service
 
 
 class RecommendationService:
+    """
+    Picks the next question after a submission. Candidates are loaded with
+    summary columns only (summary_load()) unless full=True, for callers
+    that return the whole question: the picks are single rows (or the few
+    neighbours pick_similar compares), so loading them whole is cheaper
+    than reloading the winner.
+    """
+
     def recommend_next(
         self,
         user_id: UUID,
         last_question_id: UUID,
         is_correct: bool,
         session: Session,
-    ) -> Optional[QuestionRead]:
+        full: bool = False,
+    ) -> Optional[Question]:
+        candidate_load = [] if full else [summary_load()]
+
         # 1) Fetch the last question
-        last_q = session.query(Question).get(last_question_id)
+        last_q = session.get(Question, last_question_id, options=[summary_load()])
         if not last_q:
             return None
 
         # 2) If it's a composite child, delegate to composite handler
         if last_q.parent_id is not None:
-            return self._recommend_composite(user_id, last_q, session)
+            return self._recommend_composite(user_id, last_q, session, candidate_load)
 
         # 3) Handle simple question logic
         last_type = last_q.type
         last_diff = last_q.difficulty or 1
 
-        # Fetch answered question IDs
-        answered = session.query(UserQuestionProgress.question_id).filter(
+        # Answered question IDs, kept as a subquery rather than fetched
+        answered_ids = select(UserQuestionProgress.question_id).where(
             UserQuestionProgress.user_id == user_id
         )
-        answered_ids = [qid for (qid,) in answered]
 
         # Exclude composite parents
-        child_parents = session.query(Question.parent_id).filter(Question.parent_id != None)
+        child_parents = select(Question.parent_id).where(Question.parent_id != None)
 
-        base_q = session.query(Question).filter(
+        base_q = session.query(Question).options(*candidate_load).filter(
+            live(),
             ~Question.id.in_(answered_ids),
             ~Question.id.in_(child_parents),
             Question.type == last_type,
@@ -64,73 +76,74 @@ class RecommendationService:
                     .first()
                 )
 
+        # Prefer the nearest unanswered neighbour of the last question over a random pick
+        if not candidate:
+            candidate = similarity_service.pick_similar(last_q.id, base_q, session)
+
         if not candidate:
             candidate = base_q.order_by(func.random()).first()
 
-        return QuestionRead.from_orm(candidate) if candidate else None
+        return candidate
 
     def _recommend_composite(
         self,
         user_id: UUID,
         last_q: Question,
-        session: Session
-    ) -> Optional[QuestionRead]:
+        session: Session,
+        candidate_load: list,
+    ) -> Optional[Question]:
         # Use parent ID to identify the composite set
         parent_id = last_q.parent_id
 
-        # Get all children of the current parent in order
-        children = session.query(Question).filter(
-            Question.parent_id == parent_id
-        ).order_by(Question.order).all()
-
-        # Fetch all answered question IDs once
-        answered_ids = {
-            qid for (qid,) in session.query(UserQuestionProgress.question_id)
-            .filter(UserQuestionProgress.user_id == user_id)
-            .all()
-        }
-
-        # Serve next unanswered child
-        for child in children:
-            if child.id not in answered_ids:
-                return QuestionRead.from_orm(child)
-
-        # All children completed → move to next composite parent
-        all_parents = session.query(Question).filter(
-            Question.parent_id == None,
-            Question.type == session.query(Question).get(parent_id).type
-        ).all()
-
-        attempted_parent_ids = []
-        for parent in all_parents:
-            composite_children = session.query(Question).filter(
-                Question.parent_id == parent.id
-            ).all()
-            if all(child.id in answered_ids for child in composite_children):
-                attempted_parent_ids.append(parent.id)
-
-        # Find next parent not fully attempted
-        next_parent = (
+        answered_ids = select(UserQuestionProgress.question_id).where(
+            UserQuestionProgress.user_id == user_id
+        )
+
+        # Serve next unanswered child of the current parent, in order
+        next_child = (
             session.query(Question)
-            .filter(
-                Question.parent_id == None,
-                Question.type == session.query(Question).get(parent_id).type,
-                ~Question.id.in_(attempted_parent_ids),
-                Question.id != parent_id
-            )
-            .order_by(func.random())
+            .options(*candidate_load)
+            .filter(Question.parent_id == parent_id, live(), ~Question.id.in_(answered_ids))
+            .order_by(Question.order)
             .first()
         )
+        if next_child:
+            return next_child
+
+        # All children completed → move to next composite parent.
+        # Parents whose live children are all answered, in one grouped query
+        completed_parents = (
+            select(Question.parent_id)
+            .where(Question.parent_id != None, live())
+            .group_by(Question.parent_id)
+            .having(func.bool_and(Question.id.in_(answered_ids)))
+        )
+        parent = session.get(Question, parent_id, options=[summary_load()])
+
+        # Find next parent not fully attempted (and with a live subquestion to
+        # start on), preferring passages similar to this one
+        parent_candidates = session.query(Question).options(summary_load()).filter(
+            Question.parent_id == None,
+            live(),
+            Question.type == parent.type,
+            Question.first_subquestion_id != None,
+            ~Question.id.in_(completed_parents),
+            Question.id != parent_id
+        )
+        next_parent = similarity_service.pick_similar(parent_id, parent_candidates, session)
+        if not next_parent:
+            next_parent = parent_candidates.order_by(func.random()).first()
 
         if next_parent:
             first_child = (
                 session.query(Question)
-                .filter(Question.parent_id == next_parent.id)
+                .options(*candidate_load)
+                .filter(Question.parent_id == next_parent.id, live())
                 .order_by(Question.order)
                 .first()
             )
             if first_child:
-                return QuestionRead.from_orm(first_child)
+                return first_child
 
         return None
 
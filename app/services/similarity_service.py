@@ -0,0 +1,202 @@
+# app/services/similarity_service.py
+import hashlib
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Query, Session
+
+from app.db import session_scope
+from app.models.question import Question, live
+from app.models.question_embedding import QuestionEmbedding
+from app.observability.metrics import track_openai
+from app.services.tutoring_bot import client, extract_text
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+EMBED_BATCH_SIZE = 100
+# Questions per indexing transaction for background and CLI indexing
+INDEX_CHUNK_SIZE = int(os.getenv("EMBED_INDEX_CHUNK_SIZE", "500"))
+SIMILAR_K = int(os.getenv("SIMILAR_QUESTIONS_K", "10"))
+EMBED_ON_INGEST = os.getenv("EMBED_QUESTIONS_ON_INGEST", "true").lower() == "true"
+
+
+def question_text(q: Question) -> str:
+    """Text used for a question's embedding: its content plus option text."""
+    parts = [extract_text(q)]
+    parts.extend(extract_text(opt) for opt in q.options or [])
+    return "\n".join(p for p in parts if p)
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class SimilarityService:
+    def index_questions(self, qids: Iterable[UUID], session: Session) -> int:
+        """
+        (Re)embed the given questions when their text changed, refresh their
+        neighbour lists, and mark their new neighbours' lists stale. Returns
+        how many questions were embedded.
+        """
+        qids = list(qids)
+        if not qids:
+            return 0
+
+        questions = (
+            session.query(Question)
+            .filter(Question.id.in_(qids))
+            .all()
+        )
+        hashes: Dict[UUID, str] = dict(
+            session.execute(
+                select(QuestionEmbedding.question_id, QuestionEmbedding.text_hash)
+                .where(QuestionEmbedding.question_id.in_(qids))
+            ).all()
+        )
+
+        pending = []
+        for q in questions:
+            text = question_text(q)
+            digest = _text_hash(text)
+            if text and hashes.get(q.id) != digest:
+                pending.append((q.id, text, digest))
+
+        vectors: Dict[UUID, List[float]] = {}
+        for start in range(0, len(pending), EMBED_BATCH_SIZE):
+            chunk = pending[start:start + EMBED_BATCH_SIZE]
+            resp = track_openai(
+                "embedding",
+                client.embeddings.create,
+                input=[text for _, text, _ in chunk],
+                model=EMBEDDING_MODEL,
+            )
+            rows = []
+            for (qid, _, digest), item in zip(chunk, resp.data):
+                vectors[qid] = item.embedding
+                rows.append({"question_id": qid, "embedding": item.embedding, "text_hash": digest})
+            stmt = pg_insert(QuestionEmbedding).values(rows)
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=[QuestionEmbedding.question_id],
+                set_={
+                    "embedding": stmt.excluded.embedding,
+                    "text_hash": stmt.excluded.text_hash,
+                    "similar_refreshed_at": None,
+                    "updated_at": datetime.now(timezone.utc),
+                },
+            ))
+
+        by_id = {q.id: q for q in questions}
+        stale = set()
+        for qid, vector in vectors.items():
+            stale.update(self._store_neighbors(by_id[qid], vector, session))
+        # New/changed questions may belong in their neighbours' top-k; refresh lazily
+        stale -= set(vectors)
+        if stale:
+            session.execute(
+                update(QuestionEmbedding)
+                .where(QuestionEmbedding.question_id.in_(stale))
+                .values(similar_refreshed_at=None)
+            )
+        session.commit()
+        return len(vectors)
+
+    def index_questions_in_background(self, qids: Sequence[UUID]) -> None:
+        """
+        BackgroundTasks entry point: index with a fresh session, never
+        raising. Works through INDEX_CHUNK_SIZE questions per transaction so
+        a bulk import doesn't hold one transaction (and every vector) for
+        the whole batch, and a failed chunk doesn't lose the others.
+        """
+        with session_scope() as db:
+            for start in range(0, len(qids), INDEX_CHUNK_SIZE):
+                chunk = qids[start:start + INDEX_CHUNK_SIZE]
+                try:
+                    self.index_questions(chunk, db)
+                except Exception:
+                    db.rollback()
+                    logger.exception("Failed to index embeddings for %d questions", len(chunk))
+
+    def refresh_stale(self, session: Session, limit: int = 1000) -> int:
+        """Recompute neighbour lists that were marked stale by later inserts."""
+        stale = session.execute(
+            select(QuestionEmbedding.question_id, QuestionEmbedding.embedding)
+            .where(QuestionEmbedding.similar_refreshed_at == None)
+            .limit(limit)
+        ).all()
+        questions = {
+            q.id: q for q in session.query(Question)
+            .filter(Question.id.in_([qid for qid, _ in stale]))
+        }
+        for qid, vector in stale:
+            if qid in questions:
+                self._store_neighbors(questions[qid], vector, session)
+        session.commit()
+        return len(stale)
+
+    def get_similar(self, qid: UUID, session: Session) -> Optional[Tuple[List[UUID], bool]]:
+        """
+        Stored neighbours of a question and whether they are stale, or None
+        if it is not indexed. Read-only; see refresh_in_background.
+        """
+        row = session.execute(
+            select(QuestionEmbedding.similar_ids, QuestionEmbedding.similar_refreshed_at)
+            .where(QuestionEmbedding.question_id == qid)
+        ).first()
+        if row is None:
+            return None
+        return list(row.similar_ids or []), row.similar_refreshed_at is None
+
+    def refresh_in_background(self, qid: UUID) -> None:
+        """BackgroundTasks entry point: recompute one stale neighbour list, never raising."""
+        try:
+            with session_scope() as db:
+                row = db.get(QuestionEmbedding, qid)
+                question = db.get(Question, qid)
+                if row is not None and question is not None and row.similar_refreshed_at is None:
+                    self._store_neighbors(question, row.embedding, db)
+                    db.commit()
+        except Exception:
+            logger.exception("Failed to refresh similar questions for %s", qid)
+
+    def pick_similar(self, qid: UUID, candidates: Query, session: Session) -> Optional[Question]:
+        """Nearest precomputed neighbour of `qid` that is also in the candidate query."""
+        similar = self.get_similar(qid, session)
+        similar_ids = similar[0] if similar else None
+        if not similar_ids:
+            return None
+        found = {q.id: q for q in candidates.filter(Question.id.in_(similar_ids)).all()}
+        return next((found[sid] for sid in similar_ids if sid in found), None)
+
+    def _store_neighbors(self, question: Question, vector, session: Session) -> List[UUID]:
+        neighbors = self._nearest(question, vector, session)
+        session.execute(
+            update(QuestionEmbedding)
+            .where(QuestionEmbedding.question_id == question.id)
+            .values(similar_ids=neighbors, similar_refreshed_at=datetime.now(timezone.utc))
+        )
+        return neighbors
+
+    def _nearest(self, question: Question, vector, session: Session) -> List[UUID]:
+        # Compare like with like: standalone/parents with top-level questions,
+        # subquestions with subquestions from other composite groups
+        if question.parent_id is None:
+            scope = [Question.parent_id == None]
+        else:
+            scope = [Question.parent_id != None, Question.parent_id != question.parent_id]
+        stmt = (
+            select(QuestionEmbedding.question_id)
+            .join(Question, Question.id == QuestionEmbedding.question_id)
+            .where(QuestionEmbedding.question_id != question.id, live(), *scope)
+            .order_by(QuestionEmbedding.embedding.cosine_distance(vector))
+            .limit(SIMILAR_K)
+        )
+        return list(session.execute(stmt).scalars())
+
+
+similarity_service = SimilarityService()
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 
 from app.models.memory import UserMemory
 from app.models.question import Question
+from app.observability.metrics import track_openai
 from app.services.question_service import question_service
 
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
@@ -15,7 +16,9 @@ client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 # — Embedding helper
 def get_embedding(text: str) -> List[float]:
-    resp = client.embeddings.create(
+    resp = track_openai(
+        "embedding",
+        client.embeddings.create,
         input=text,
         model="text-embedding-ada-002"
     )
@@ -114,7 +117,8 @@ async def handle_tutoring(
     db: Session,
     user_id: UUID,
     user_input: str,
-    context: Optional[Dict[str, Any]] = None
+    context: Optional[Dict[str, Any]] = None,
+    read_db: Optional[Session] = None,
 ) -> Dict[str, Any]:
     # A) Save the user’s message
     user_emb = get_embedding(user_input)
@@ -144,8 +148,10 @@ async def handle_tutoring(
     if user_input.strip().lower().startswith("please explain this question.") and q_obj and q_obj.explanation:
         reply = q_obj.explanation
     else:
-        # D) Retrieve full UserMemory objects and build the prompt
-        memories = fetch_tutoring_memories(db, user_id, user_emb)
+        # D) Retrieve full UserMemory objects and build the prompt. This is a
+        # similarity search, not a transcript, so a replica that hasn't
+        # replayed the message saved above is fine (the prompt carries it).
+        memories = fetch_tutoring_memories(read_db or db, user_id, user_emb)
         snippets_used = [m.message for m in memories]
 
         prompt = build_tutoring_prompt(
@@ -155,7 +161,9 @@ async def handle_tutoring(
         )
 
         # E) Call OpenAI
-        resp = client.chat.completions.create(
+        resp = track_openai(
+            "chat",
+            client.chat.completions.create,
             model="gpt-4.1-nano",
             messages=prompt,
             temperature=0.6
@@ -0,0 +1,76 @@
+# benchmarks/bench_question_endpoints.py
+"""
+Latency of the question list and detail endpoints against a running API.
+
+Run it once before and once after a schema change (e.g. the JSON -> JSONB
+migration) and compare:
+
+    python -m benchmarks.bench_question_endpoints --token $JWT --out before.json
+    alembic upgrade head && restart the API
+    python -m benchmarks.bench_question_endpoints --token $JWT --compare before.json
+
+Detail requests are split into cold (first fetch of an id, which reads the
+row) and warm (served from the in-process payload cache after a version
+check), since only the cold path touches the JSON columns.
+"""
+import argparse
+import json
+import time
+from typing import Dict
+
+import requests
+
+from benchmarks.stats import load_results, print_results, summarize
+
+
+def timed_get(http: requests.Session, url: str, **params) -> float:
+    start = time.perf_counter()
+    resp = http.get(url, params=params)
+    elapsed = (time.perf_counter() - start) * 1000
+    resp.raise_for_status()
+    return elapsed
+
+
+def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    http = requests.Session()
+    if args.token:
+        http.headers["Authorization"] = f"Bearer {args.token}"
+    base = args.base_url.rstrip("/") + "/api/questions"
+
+    listing = http.get(base, params={"limit": args.ids})
+    listing.raise_for_status()
+    ids = [q["id"] for q in listing.json()]
+    if not ids:
+        raise SystemExit("no questions returned by the list endpoint; seed some first")
+
+    list_samples = [timed_get(http, base, limit=args.page_size) for _ in range(args.requests)]
+    cold = [timed_get(http, f"{base}/{qid}") for qid in ids]
+    warm = [timed_get(http, f"{base}/{ids[i % len(ids)]}") for i in range(args.requests)]
+    return {
+        "list": summarize(list_samples),
+        "detail_cold": summarize(cold),
+        "detail_warm": summarize(warm),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", help="bearer token; the list endpoint requires auth")
+    parser.add_argument("--requests", type=int, default=200, help="requests per list/warm-detail run")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--ids", type=int, default=100, help="distinct questions for cold detail fetches")
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --out run")
+    args = parser.parse_args()
+
+    results = run(args)
+    baseline = load_results(args.compare) if args.compare else None
+    print_results(results, baseline)
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
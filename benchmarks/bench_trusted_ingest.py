@@ -0,0 +1,95 @@
+# benchmarks/bench_trusted_ingest.py
+"""
+Per-row cost of turning a bulk JSON payload into insert rows.
+
+  before:  json body -> List[QuestionCreate] -> model_dump() -> question_row()
+           (the validated bulk/NDJSON/CLI ingest path)
+  after:   json body -> trusted TypeAdapter -> question_row()
+           (POST /api/questions/bulk/trusted)
+
+Both must produce the same rows; the script checks that before timing.
+
+    python -m benchmarks.bench_trusted_ingest --rows 2000
+"""
+import argparse
+import json
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+from pydantic import TypeAdapter
+
+from app.schemas.question import QuestionCreate
+from app.services.question_ingest import question_row, trusted_batch_adapter
+
+_model_batch_adapter = TypeAdapter(List[QuestionCreate])
+
+
+def make_row(i: int) -> Dict[str, Any]:
+    paragraph = {"type": "paragraph", "text": f"Question {i}: " + "If x and y are integers, " * 8}
+    table = {
+        "type": "table",
+        "headers": ["Year", "Revenue", "Cost"],
+        "rows": [[str(2000 + r), str(r * 13), str(r * 7)] for r in range(6)],
+    }
+    options = [
+        {"id": letter, "blocks": [{"type": "paragraph", "text": f"Option {letter} for {i}"}]}
+        for letter in "ABCDE"
+    ]
+    return {
+        "type": "problem-solving",
+        "content": [paragraph, table],
+        "options": options,
+        "answers": {"correct_option_id": "C"},
+        "tags": ["algebra", "inequalities"],
+        "difficulty": 1 + i % 7,
+        "extras": {"source_ref": f"bank-{i}"},
+        "source": "benchmark",
+    }
+
+
+def before(body: bytes, qid: Callable[[], uuid.UUID] = uuid.uuid4) -> List[Dict[str, Any]]:
+    return [
+        question_row(p.model_dump(), qid(), p.parent_id)
+        for p in _model_batch_adapter.validate_python(json.loads(body))
+    ]
+
+
+def after(body: bytes, qid: Callable[[], uuid.UUID] = uuid.uuid4) -> List[Dict[str, Any]]:
+    return [
+        question_row(data, qid(), data.get("parent_id"))
+        for data in trusted_batch_adapter.validate_json(body)
+    ]
+
+
+def best_of(fn: Callable[[bytes], Any], body: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(body)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    body = json.dumps([make_row(i) for i in range(args.rows)]).encode()
+    fixed_id = uuid.UUID(int=0)
+    if before(body, lambda: fixed_id) != after(body, lambda: fixed_id):
+        raise SystemExit("trusted rows differ from validated rows")
+    t_before = best_of(before, body, args.repeat)
+    t_after = best_of(after, body, args.repeat)
+
+    per_row = lambda t: t / args.rows * 1e6
+    print(f"rows: {args.rows}, payload: {len(body) / 1024:.0f} KiB, best of {args.repeat}")
+    print(f"before (models + model_dump): {per_row(t_before):8.1f} us/row")
+    print(f"after  (trusted TypeAdapter): {per_row(t_after):8.1f} us/row")
+    print(f"speedup: {t_before / t_after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# benchmarks/check_query_plans.py
+"""
+Check the plans of the hot SQL statements against a seeded database.
+
+    python -m benchmarks.load.seed --reset     # once, against a local database
+    python -m benchmarks.check_query_plans [--show-plans]
+
+Each check calls the real service code (get_summaries, ProgressService.record,
+the recommendation candidate queries, fetch_tutoring_memories and the
+dashboard counts) for a seeded user. Every SELECT it sends is captured and run
+again under EXPLAIN (FORMAT JSON) with the same parameters, and the plan must
+not contain a Seq Scan on the per-user tables in PER_USER_TABLES. Everything
+runs in one transaction that is rolled back, so record() leaves no rows
+behind. Exits 1 if any check fails, so a migration that drops or breaks an
+index fails here instead of in production.
+"""
+import argparse
+import json
+import random
+import sys
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, configure_mappers
+
+from app.db import engine
+import app.models  # noqa: F401  (registers every mapped class)
+from app.models.progress import UserQuestionProgress
+from app.models.question import Question, live
+from app.models.user import User
+from app.schemas.progress import AnswerCreate
+from app.services.dashboard_service import DashboardService
+from app.services.progress_service import progress_service
+from app.services.question_service import question_service
+from app.services.recommendation_service import recommendation_service
+from app.services.tutoring_bot import fetch_tutoring_memories
+from benchmarks.load.seed import EMAIL_DOMAIN
+from benchmarks.load.synthetic import SOURCE, unit_vector
+
+# Tables that grow with users x activity; a Seq Scan on them is a missing index
+PER_USER_TABLES = {"user_question_progress", "user_memory"}
+
+
+class Fixtures:
+    """A seeded user with progress, plus questions to drive each code path."""
+
+    def __init__(self, session: Session):
+        self.user = session.execute(
+            select(User)
+            .join(UserQuestionProgress, UserQuestionProgress.user_id == User.id)
+            .where(User.email.like(f"%@{EMAIL_DOMAIN}"))
+            .limit(1)
+        ).scalars().first()
+        if self.user is None:
+            raise SystemExit("no synthetic data found; run python -m benchmarks.load.seed first")
+        answerable = select(Question.id).where(
+            live(), Question.source == SOURCE, Question.first_subquestion_id == None
+        )
+        answered = select(UserQuestionProgress.question_id).where(UserQuestionProgress.user_id == self.user.id)
+        self.answered_id = session.execute(
+            answerable.where(Question.parent_id == None, Question.id.in_(answered)).limit(1)
+        ).scalar()
+        self.unanswered_id = session.execute(answerable.where(~Question.id.in_(answered)).limit(1)).scalar()
+        self.child_id = session.execute(answerable.where(Question.parent_id != None).limit(1)).scalar()
+
+
+def _record(session: Session, fx: Fixtures, question_id: uuid.UUID) -> None:
+    payload = AnswerCreate(user_id=fx.user.id, selected_options=["A"], is_correct=True, time_taken=60)
+    progress_service.record(question_id, payload, session)
+
+
+CHECKS: Dict[str, Callable[[Session, Fixtures], Any]] = {
+    "get_summaries": lambda s, fx: question_service.get_summaries({"user_id": fx.user.id}, s),
+    "get_summaries incorrect": lambda s, fx: question_service.get_summaries(
+        {"user_id": fx.user.id, "progress_filter": "incorrect"}, s
+    ),
+    "progress record (update)": lambda s, fx: _record(s, fx, fx.answered_id),
+    "progress record (insert)": lambda s, fx: _record(s, fx, fx.unanswered_id),
+    "recommend after correct": lambda s, fx: recommendation_service.recommend_next(
+        fx.user.id, fx.answered_id, True, s
+    ),
+    "recommend after incorrect": lambda s, fx: recommendation_service.recommend_next(
+        fx.user.id, fx.answered_id, False, s
+    ),
+    "recommend composite": lambda s, fx: recommendation_service.recommend_next(
+        fx.user.id, fx.child_id, True, s
+    ),
+    "fetch_tutoring_memories": lambda s, fx: fetch_tutoring_memories(
+        s, fx.user.id, unit_vector(random.Random(0))
+    ),
+    "dashboard stats": lambda s, fx: DashboardService(s, fx.user).get_stats(),
+    "dashboard overall": lambda s, fx: DashboardService(s, fx.user).get_overall_progress(),
+}
+
+
+def plan_nodes(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def seq_scans(plan: Dict[str, Any]) -> List[str]:
+    """Per-user tables the plan reads with a Seq Scan."""
+    return [
+        node["Relation Name"]
+        for node in plan_nodes(plan["Plan"])
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in PER_USER_TABLES
+    ]
+
+
+def run_check(
+    session: Session, check: Callable[[Session, Fixtures], Any], fx: Fixtures
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """Run one check and return (statement, plan) for every SELECT it issued."""
+    connection = session.connection()
+    statements: List[Tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        check(session, fx)
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+
+    plans = []
+    for statement, parameters in statements:
+        raw = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+        plans.append((statement, (json.loads(raw) if isinstance(raw, str) else raw)[0]))
+    return plans
+
+
+def main() -> None:
+    configure_mappers()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--checks", type=lambda s: s.split(","), help="comma-separated check names (default: all)")
+    parser.add_argument("--show-plans", action="store_true", help="print every captured plan")
+    args = parser.parse_args()
+    names = args.checks or list(CHECKS)
+    unknown = set(names) - set(CHECKS)
+    if unknown:
+        parser.error(f"unknown checks: {', '.join(sorted(unknown))}")
+
+    failures = 0
+    with engine.connect() as connection:
+        outer = connection.begin()
+        # record() commits; with savepoints its commits stay inside `outer`
+        session = Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            # Planner statistics must reflect the seeded volumes
+            connection.exec_driver_sql("ANALYZE questions, user_question_progress, user_memory")
+            fx = Fixtures(session)
+            for name in names:
+                plans = run_check(session, CHECKS[name], fx)
+                bad = [(stmt, tables) for stmt, plan in plans if (tables := seq_scans(plan))]
+                status = "FAIL" if bad else "ok"
+                print(f"{status:<4} {name} ({len(plans)} statements)")
+                for stmt, tables in bad:
+                    failures += 1
+                    print(f"     Seq Scan on {', '.join(sorted(set(tables)))} in:")
+                    print("     " + " ".join(stmt.split())[:300])
+                if args.show_plans:
+                    for stmt, plan in plans:
+                        print(json.dumps(plan["Plan"], indent=2))
+        finally:
+            session.close()
+            outer.rollback()
+
+    if failures:
+        print(f"{failures} statement(s) scan a per-user table sequentially")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# benchmarks/load/run.py
+"""
+Run the scripted load scenarios against the app and report latency.
+
+    python -m benchmarks.load.seed --reset           # once, against a local database
+    python -m benchmarks.load.run --users 20 --iterations 10 --out after.json
+    python -m benchmarks.load.run --users 20 --iterations 10 --compare after.json
+
+Without --base-url the app is started from benchmarks.load.stub_app (OpenAI
+stubbed) in a uvicorn subprocess on a free port, with this process's
+environment. Virtual users are the seeded users; each thread repeats the
+chosen scenarios. Per endpoint the report gives n, errors, mean and
+p50/p95/p99 latency and throughput over the whole run. --out writes it as
+JSON with the git commit, so runs can be diffed across commits.
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+import requests
+from sqlalchemy import select
+from sqlalchemy.orm import configure_mappers
+
+from app.db import session_scope
+import app.models  # noqa: F401  (registers every mapped class)
+from app.models.question import Question, live
+from app.models.user import User
+from app.services.auth import create_access_token
+from benchmarks.load.scenarios import SCENARIOS, Recorder, VirtualUser
+from benchmarks.load.seed import EMAIL_DOMAIN
+from benchmarks.load.synthetic import SOURCE
+from benchmarks.stats import load_results, print_results, summarize
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def stub_server(startup_timeout: float = 30) -> Iterator[str]:
+    port = _free_port()
+    proc = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "benchmarks.load.stub_app:app",
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+    ])
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                requests.get(base_url + "/api/health", timeout=1)
+                break
+            except requests.RequestException:
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise SystemExit("stub app failed to start")
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def load_fixtures(users: int) -> Tuple[List[UUID], List[UUID]]:
+    """Seeded user ids and the live answerable synthetic question ids."""
+    with session_scope() as session:
+        user_ids = list(session.execute(
+            select(User.id).where(User.email.like(f"%@{EMAIL_DOMAIN}")).order_by(User.email).limit(users)
+        ).scalars())
+        question_ids = list(session.execute(
+            select(Question.id).where(live(), Question.source == SOURCE, Question.first_subquestion_id == None)
+        ).scalars())
+    if not user_ids or not question_ids:
+        raise SystemExit("no synthetic data found; run python -m benchmarks.load.seed first")
+    return user_ids, question_ids
+
+
+def run_load(base_url: str, args: argparse.Namespace) -> Tuple[Recorder, float]:
+    user_ids, question_ids = load_fixtures(args.users)
+    recorder = Recorder()
+    scenarios = [SCENARIOS[name] for name in args.scenarios]
+
+    def virtual_user(index: int) -> None:
+        uid = user_ids[index % len(user_ids)]
+        user = VirtualUser(
+            base_url, uid, create_access_token({"sub": str(uid)}), question_ids,
+            recorder, random.Random(args.seed + index),
+        )
+        for _ in range(args.iterations):
+            for scenario in scenarios:
+                scenario(user)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        list(pool.map(virtual_user, range(args.users)))
+    return recorder, time.perf_counter() - start
+
+
+def report(recorder: Recorder, wall: float) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for label in sorted(recorder.samples):
+        samples = recorder.samples[label]
+        results[label] = {
+            **summarize(samples),
+            "errors": recorder.errors.get(label, 0),
+            "rps": len(samples) / wall,
+        }
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    configure_mappers()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", help="an already running API; default: start benchmarks.load.stub_app")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=10, help="scenario passes per user")
+    parser.add_argument(
+        "--scenarios", type=lambda s: s.split(","), default=list(SCENARIOS),
+        help=f"comma-separated subset of {','.join(SCENARIOS)}",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--compare", help="results JSON from an earlier --out run")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    if args.base_url:
+        recorder, wall = run_load(args.base_url, args)
+    else:
+        with stub_server() as base_url:
+            recorder, wall = run_load(base_url, args)
+
+    results = report(recorder, wall)
+    total = sum(r["n"] for r in results.values())
+    errors = sum(r["errors"] for r in results.values())
+    print(f"{total} requests ({errors} errors) in {wall:.1f}s: {total / wall:.1f} req/s")
+    print_results(results, load_results(args.compare) if args.compare else None, extra="rps")
+
+    if args.out:
+        output: Dict[str, Any] = {
+            "meta": {
+                "commit": _git_commit(),
+                "finished_at": datetime.now(timezone.utc).isoformat(),
+                "users": args.users,
+                "iterations": args.iterations,
+                "scenarios": args.scenarios,
+                "llm_latency_ms": float(os.getenv("BENCH_LLM_LATENCY_MS", "50")),
+                "wall_s": wall,
+            },
+            "results": results,
+        }
+        with open(args.out, "w") as fh:
+            json.dump(output, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# benchmarks/load/scenarios.py
+"""
+Scripted user journeys for the load test. Each scenario runs one pass of a
+journey for one virtual user; every request goes through VirtualUser.call,
+which times it under a route-template label.
+"""
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+from uuid import UUID
+
+import requests
+
+PAGE_SIZE = 20
+PROGRESS_FILTERS = ["all", "all", "attempted", "non-attempted", "incorrect"]
+TUTOR_PROMPTS = [
+    "Why is option B wrong here?",
+    "Can you give me a hint for this one?",
+    "What is the assumption in this argument?",
+    "Please explain this question.",
+]
+
+
+class Recorder:
+    """Thread-safe latency samples (ms) and error counts per endpoint label."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def add(self, label: str, ms: float, ok: bool) -> None:
+        with self._lock:
+            self.samples[label].append(ms)
+            if not ok:
+                self.errors[label] += 1
+
+
+class VirtualUser:
+    def __init__(
+        self,
+        base_url: str,
+        user_id: UUID,
+        token: str,
+        question_ids: List[UUID],
+        recorder: Recorder,
+        rng: random.Random,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.user_id = user_id
+        self.question_ids = question_ids
+        self.recorder = recorder
+        self.rng = rng
+        self.http = requests.Session()
+        self.http.headers["Authorization"] = f"Bearer {token}"
+
+    def call(self, method: str, label: str, path: str, **kwargs) -> Optional[requests.Response]:
+        start = time.perf_counter()
+        try:
+            resp = self.http.request(method, self.base_url + path, timeout=60, **kwargs)
+        except requests.RequestException:
+            self.recorder.add(label, (time.perf_counter() - start) * 1000, ok=False)
+            return None
+        self.recorder.add(label, (time.perf_counter() - start) * 1000, ok=resp.ok)
+        return resp if resp.ok else None
+
+    def random_question(self) -> UUID:
+        return self.rng.choice(self.question_ids)
+
+
+def list_pages(user: VirtualUser, pages: int = 3) -> None:
+    """Page through the question list with a progress filter, then open one question."""
+    progress_filter = user.rng.choice(PROGRESS_FILTERS)
+    listed = []
+    for page in range(pages):
+        resp = user.call(
+            "GET", "GET /api/questions", "/api/questions",
+            params={"skip": page * PAGE_SIZE, "limit": PAGE_SIZE, "progress_filter": progress_filter},
+        )
+        if resp is not None:
+            listed.extend(resp.json())
+    if listed:
+        item = user.rng.choice(listed)
+        qid = item.get("first_subquestion_id") or item["id"]
+        user.call("GET", "GET /api/questions/{q_id}", f"/api/questions/{qid}")
+
+
+def submit_loop(user: VirtualUser, steps: int = 5) -> None:
+    """Answer a run of questions, following the recommended next question each time."""
+    qid = user.random_question()
+    for _ in range(steps):
+        resp = user.call(
+            "POST", "POST /api/questions/{q_id}/submit", f"/api/questions/{qid}/submit",
+            params={"include_next": "true"},
+            json={
+                "user_id": str(user.user_id),
+                "selected_options": [user.rng.choice("ABCDE")],
+                "is_correct": user.rng.random() < 0.6,
+                "time_taken": user.rng.randint(20, 180),
+            },
+        )
+        next_id = resp.json().get("next_question_id") if resp is not None else None
+        qid = next_id or user.random_question()
+
+
+def dashboard(user: VirtualUser) -> None:
+    user.call("GET", "GET /api/dashboard", "/api/dashboard")
+
+
+def chat(user: VirtualUser) -> None:
+    """One tutoring exchange about a question (the LLM is stubbed by stub_app)."""
+    user.call(
+        "POST", "POST /api/chat/message", "/api/chat/message",
+        headers={"X-User-Id": str(user.user_id)},
+        json={
+            "message": user.rng.choice(TUTOR_PROMPTS),
+            "chat_type": "tutoring",
+            "context": {"question": {"id": str(user.random_question())}},
+        },
+    )
+
+
+SCENARIOS: Dict[str, Callable[[VirtualUser], None]] = {
+    "list": list_pages,
+    "submit": submit_loop,
+    "dashboard": dashboard,
+    "chat": chat,
+}
@@ -0,0 +1,162 @@
+# benchmarks/load/seed.py
+"""
+Seed the database in DATABASE_URL with synthetic load-test data.
+
+    python -m benchmarks.load.seed --singles 2000 --rc-groups 150 --msr-groups 50 \
+        --users 200 --progress 150 --memories 40
+
+Questions go through QuestionIngestor like a real import, so the
+denormalized list columns are filled the same way. Users get profiles,
+progress histories over the live answerable questions and tutoring
+memories with random unit vectors. Everything is tagged (question source
+"synthetic-load", user emails @load.test) so --reset removes exactly what
+an earlier run added. Point it at a local database, never production.
+"""
+import argparse
+import random
+import time
+import uuid
+from typing import List
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import configure_mappers
+
+from app.db import session_scope
+import app.models  # noqa: F401  (registers every mapped class)
+from app.models.memory import UserMemory
+from app.models.profile import UserProfile
+from app.models.progress import UserQuestionProgress
+from app.models.question import Question, live
+from app.models.user import User
+from app.services.question_ingest import QuestionIngestor, trusted_row_adapter
+from benchmarks.load.synthetic import SOURCE, answered_at, question_bank, sentence, unit_vector
+
+EMAIL_DOMAIN = "load.test"
+BATCH = 1000
+
+
+def user_email(i: int) -> str:
+    return f"load-user-{i}@{EMAIL_DOMAIN}"
+
+
+def reset(session) -> None:
+    users = select(User.id).where(User.email.like(f"%@{EMAIL_DOMAIN}"))
+    questions = select(Question.id).where(Question.source == SOURCE)
+    session.execute(delete(UserQuestionProgress).where(
+        UserQuestionProgress.user_id.in_(users) | UserQuestionProgress.question_id.in_(questions)
+    ))
+    session.execute(delete(UserMemory).where(UserMemory.user_id.in_(users)))
+    session.execute(delete(UserProfile).where(UserProfile.user_id.in_(users)))
+    session.execute(delete(User).where(User.id.in_(users)))
+    # Embeddings and fingerprints cascade; parents and children go in one statement
+    session.execute(delete(Question).where(Question.source == SOURCE))
+    session.commit()
+
+
+def seed_questions(session, rng: random.Random, args: argparse.Namespace) -> int:
+    ingestor = QuestionIngestor(session, batch_size=BATCH)
+    bank = question_bank(rng, args.singles, args.rc_groups, args.msr_groups, args.children)
+    for line, payload in enumerate(bank, start=1):
+        ingestor.add(line, trusted_row_adapter.validate_python(payload))
+    ingestor.flush()
+    session.commit()
+    return ingestor.created
+
+
+def seed_users(session, args: argparse.Namespace) -> List[uuid.UUID]:
+    ids = [uuid.uuid4() for _ in range(args.users)]
+    session.execute(insert(User), [
+        {"id": uid, "email": user_email(i), "name": f"Load User {i}", "is_active": True}
+        for i, uid in enumerate(ids)
+    ])
+    session.execute(insert(UserProfile), [
+        {"user_id": uid, "onboarding_complete": True, "target_score": 705, "exam_date": "2027-03-01"}
+        for uid in ids
+    ])
+    session.commit()
+    return ids
+
+
+def seed_progress(session, rng: random.Random, users: List[uuid.UUID], args: argparse.Namespace) -> int:
+    # Answerable questions: everything live except composite parents
+    answerable = session.execute(
+        select(Question.id, Question.difficulty).where(
+            live(), Question.source == SOURCE, Question.first_subquestion_id == None
+        )
+    ).all()
+    rows, total = [], 0
+    for uid in users:
+        for qid, difficulty in rng.sample(answerable, min(args.progress, len(answerable))):
+            rows.append({
+                "id": uuid.uuid4(),
+                "user_id": uid,
+                "question_id": qid,
+                # Harder questions are missed more often
+                "is_correct": rng.random() > difficulty / 10,
+                "selected_options": [rng.choice("ABCDE")],
+                "answered_at": answered_at(rng),
+                "time_taken": rng.randint(20, 240),
+            })
+            if len(rows) >= BATCH:
+                session.execute(insert(UserQuestionProgress), rows)
+                total += len(rows)
+                rows = []
+    if rows:
+        session.execute(insert(UserQuestionProgress), rows)
+        total += len(rows)
+    session.commit()
+    return total
+
+
+def seed_memories(session, rng: random.Random, users: List[uuid.UUID], args: argparse.Namespace) -> int:
+    total = 0
+    for uid in users:
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "user_id": uid,
+                "message": sentence(rng, rng.randint(6, 30)),
+                "embedding": unit_vector(rng),
+                "type": "tutoring",
+                "source": "user" if i % 2 == 0 else "assistant",
+            }
+            for i in range(args.memories)
+        ]
+        if rows:
+            session.execute(insert(UserMemory), rows)
+            total += len(rows)
+    session.commit()
+    return total
+
+
+def main() -> None:
+    configure_mappers()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--singles", type=int, default=2000, help="standalone questions")
+    parser.add_argument("--rc-groups", type=int, default=150, help="reading-comprehension passages")
+    parser.add_argument("--msr-groups", type=int, default=50, help="multi-source-reasoning sets")
+    parser.add_argument("--children", type=int, default=4, help="subquestions per composite group")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--progress", type=int, default=150, help="answered questions per user")
+    parser.add_argument("--memories", type=int, default=40, help="tutoring memories per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="remove earlier synthetic data first")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    with session_scope() as session:
+        if args.reset:
+            reset(session)
+        questions = seed_questions(session, rng, args)
+        users = seed_users(session, args)
+        progress = seed_progress(session, rng, users, args)
+        memories = seed_memories(session, rng, users, args)
+    print(
+        f"seeded {questions} questions, {len(users)} users, {progress} progress rows, "
+        f"{memories} memories in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
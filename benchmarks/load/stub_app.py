@@ -0,0 +1,68 @@
+# benchmarks/load/stub_app.py
+"""
+The Clara app with OpenAI replaced by a local stub, for load tests:
+
+    uvicorn benchmarks.load.stub_app:app --port 8001
+
+Embeddings are deterministic unit vectors derived from the input text;
+chat completions return a canned reply after BENCH_LLM_LATENCY_MS, so
+chat scenarios measure our own code plus a fixed, known upstream delay.
+Usage blocks are filled in so the OpenAI metrics still move.
+"""
+import hashlib
+import os
+import random
+import time
+from types import SimpleNamespace
+from typing import Any, List, Union
+
+from app.main import app  # noqa: F401  (re-exported for uvicorn)
+from app.services import onboarding_bot, similarity_service, tutoring_bot
+from benchmarks.load.synthetic import unit_vector
+
+BENCH_LLM_LATENCY_MS = float(os.getenv("BENCH_LLM_LATENCY_MS", "50"))
+STUB_REPLY = (
+    "Start from what the question asks, then eliminate the options that "
+    "contradict the passage. updated_fields: {}"
+)
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class _Embeddings:
+    def create(self, input: Union[str, List[str]], model: str, **_: Any) -> SimpleNamespace:
+        texts = [input] if isinstance(input, str) else list(input)
+        data = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+            data.append(SimpleNamespace(embedding=unit_vector(random.Random(seed))))
+        prompt = sum(_tokens(t) for t in texts)
+        return SimpleNamespace(data=data, usage=SimpleNamespace(prompt_tokens=prompt, total_tokens=prompt))
+
+
+class _Completions:
+    def create(self, model: str, messages: List[dict], **_: Any) -> SimpleNamespace:
+        time.sleep(BENCH_LLM_LATENCY_MS / 1000)
+        prompt = sum(_tokens(m.get("content") or "") for m in messages)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=STUB_REPLY))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt,
+                completion_tokens=_tokens(STUB_REPLY),
+                total_tokens=prompt + _tokens(STUB_REPLY),
+            ),
+        )
+
+
+class StubOpenAI:
+    def __init__(self):
+        self.embeddings = _Embeddings()
+        self.chat = SimpleNamespace(completions=_Completions())
+
+
+stub_client = StubOpenAI()
+# similarity_service imported tutoring_bot's client by name, so patch it there too
+for module in (onboarding_bot, tutoring_bot, similarity_service):
+    module.client = stub_client
@@ -0,0 +1,135 @@
+# benchmarks/load/synthetic.py
+"""
+Deterministic synthetic GMAT-style content: question payloads in the
+QuestionCreate dict shape (composite RC/MSR groups included), progress
+histories and memory vectors. Everything is driven by one random.Random,
+so the same seed always gives the same data.
+"""
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List
+
+SOURCE = "synthetic-load"
+EMBEDDING_DIM = 1536
+
+SINGLE_TYPES = [
+    "problem-solving",
+    "data-sufficiency",
+    "critical-reasoning",
+    "table-analysis",
+    "graphics-interpretation",
+    "two-part-analysis",
+]
+# Subquestions get a non-composite type of their own; category stats use the parent's
+SUBQUESTION_TYPE = "multiple-choice"
+TAGS = [
+    "algebra", "arithmetic", "geometry", "word-problems", "number-properties",
+    "inequalities", "statistics", "assumption", "strengthen", "weaken",
+    "inference", "main-idea", "tables", "charts", "rates",
+]
+_WORDS = (
+    "the company reported that revenue increased while costs remained flat "
+    "over the period analysts argue this trend cannot continue because demand "
+    "for the product depends on prices which have risen sharply in several "
+    "regions if x and y are positive integers what is the value of the ratio "
+    "researchers found that participants who slept more performed better on "
+    "memory tasks although the sample was small and self selected"
+).split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(_WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def paragraph(rng: random.Random, sentences: int) -> Dict[str, Any]:
+    return {"type": "paragraph", "text": " ".join(sentence(rng, rng.randint(8, 20)) for _ in range(sentences))}
+
+
+def table(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "type": "table",
+        "headers": ["Region", "Q1", "Q2", "Q3", "Q4"],
+        "rows": [
+            [f"R{r}"] + [str(rng.randint(10, 999)) for _ in range(4)]
+            for r in range(rng.randint(4, 10))
+        ],
+    }
+
+
+def options(rng: random.Random, count: int = 5) -> List[Dict[str, Any]]:
+    return [
+        {"id": letter, "blocks": [{"type": "paragraph", "text": sentence(rng, rng.randint(3, 12))}]}
+        for letter in "ABCDE"[:count]
+    ]
+
+
+def single_question(rng: random.Random, qtype: str) -> Dict[str, Any]:
+    content = [paragraph(rng, rng.randint(1, 3))]
+    if qtype in ("table-analysis", "graphics-interpretation"):
+        content.append(table(rng))
+    content.append({"type": "paragraph", "text": sentence(rng, rng.randint(6, 14))})
+    opts = options(rng)
+    return {
+        "type": qtype,
+        "content": content,
+        "options": opts,
+        "answers": {"correct_option_id": rng.choice(opts)["id"]},
+        "tags": rng.sample(TAGS, rng.randint(1, 3)),
+        "difficulty": rng.randint(1, 7),
+        "extras": {},
+        "source": SOURCE,
+    }
+
+
+def composite_group(rng: random.Random, qtype: str, children: int) -> List[Dict[str, Any]]:
+    """A composite parent (passage or MSR sources) followed by its subquestions, in ingest order."""
+    if qtype == "multi-source-reasoning":
+        content = [paragraph(rng, 3), table(rng), paragraph(rng, 2)]
+    else:
+        content = [paragraph(rng, rng.randint(4, 8)) for _ in range(rng.randint(2, 4))]
+    difficulty = rng.randint(1, 7)
+    group = [{
+        "type": qtype,
+        "content": content,
+        "options": [],
+        "answers": {},
+        "tags": rng.sample(TAGS, 2),
+        "difficulty": difficulty,
+        "extras": {},
+        "source": SOURCE,
+    }]
+    for order in range(1, children + 1):
+        child = single_question(rng, SUBQUESTION_TYPE)
+        child["content"] = [{"type": "paragraph", "text": sentence(rng, rng.randint(8, 16))}]
+        child["difficulty"] = difficulty
+        child["order"] = order
+        group.append(child)
+    return group
+
+
+def question_bank(
+    rng: random.Random,
+    singles: int,
+    rc_groups: int,
+    msr_groups: int,
+    children_per_group: int = 4,
+) -> Iterator[Dict[str, Any]]:
+    """Payloads in ingest order: composite children directly follow their parent."""
+    for i in range(singles):
+        yield single_question(rng, SINGLE_TYPES[i % len(SINGLE_TYPES)])
+    for _ in range(rc_groups):
+        yield from composite_group(rng, "reading-comprehension", children_per_group)
+    for _ in range(msr_groups):
+        yield from composite_group(rng, "multi-source-reasoning", children_per_group)
+
+
+def answered_at(rng: random.Random, days: int = 90) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(seconds=rng.randint(0, days * 86400))
+
+
+def unit_vector(rng: random.Random, dim: int = EMBEDDING_DIM) -> List[float]:
+    values = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]
@@ -0,0 +1,143 @@
+# benchmarks/micro/cases.py
+"""
+Microbenchmark cases for the CPU-bound code that runs on every request.
+
+Each case is a zero-argument callable over fixtures built once from
+benchmarks.load.synthetic, so the content has realistic shape and size:
+multi-paragraph passages, tables, five options with blocks, a parent
+passage for composite children. Nothing here touches the database or
+OpenAI; ORM objects are transient instances.
+"""
+import random
+import uuid
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import configure_mappers
+
+import app.models  # noqa: F401  (registers every mapped class)
+from app.models.memory import UserMemory
+from app.models.question import Question
+from app.schemas.question import QuestionSearchHit, QuestionSummaryRead
+from app.services.onboarding_bot import build_onboarding_prompt, extract_updated_fields
+from app.services.question_ingest import question_row, trusted_row_adapter
+from app.services.question_service import build_preview_text, build_summaries, question_service
+from app.services.tutoring_bot import build_tutoring_prompt, extract_text
+from benchmarks.load.synthetic import composite_group, sentence, single_question
+
+PAGE_SIZE = 20
+# The columns get_summaries selects, in order, with a user's progress joined
+SummaryRow = namedtuple("SummaryRow", [
+    "id", "type", "difficulty", "tags", "parent_id", "order",
+    "preview_text", "first_subquestion_id", "attempted", "correct",
+])
+_summary_list_adapter = TypeAdapter(List[QuestionSummaryRead])
+
+ONBOARDING_REPLY = (
+    "Great, a 705 is a solid goal and very achievable with a few months of practice. "
+    "When are you planning to sit the exam?\n"
+    'updated_fields: {"target_score": 705, "country": "India"}'
+)
+TUTORING_REPLY = (
+    "Start by restating the conclusion in your own words. The argument assumes that "
+    "the trend in the first two quarters continues, so look for the option that "
+    "breaks that link. Option C does exactly that."
+)
+
+
+def question_from_payload(payload: Dict[str, Any], parent_id: uuid.UUID = None) -> Question:
+    now = datetime.now(timezone.utc)
+    return Question(
+        id=uuid.uuid4(),
+        parent_id=parent_id,
+        order=payload.get("order"),
+        type=payload["type"],
+        content=payload["content"],
+        options=payload["options"],
+        answers=payload["answers"],
+        tags=payload["tags"],
+        difficulty=payload["difficulty"],
+        extras=payload["extras"],
+        created_at=now,
+        updated_at=now,
+        source=payload["source"],
+        is_deleted=False,
+        preview_text=build_preview_text(payload["content"]),
+    )
+
+
+def memories(rng: random.Random, count: int, kind: str) -> List[UserMemory]:
+    return [
+        UserMemory(
+            user_id=uuid.uuid4(),
+            message=sentence(rng, rng.randint(6, 40)),
+            type=kind,
+            source="user" if i % 2 == 0 else "assistant",
+        )
+        for i in range(count)
+    ]
+
+
+def summary_rows(rng: random.Random, count: int) -> List[SummaryRow]:
+    rows = []
+    for i in range(count):
+        payload = single_question(rng, "critical-reasoning")
+        attempted = i % 3 != 0
+        rows.append(SummaryRow(
+            id=uuid.uuid4(),
+            type=payload["type"],
+            difficulty=payload["difficulty"],
+            tags=payload["tags"],
+            # Every fourth row is a composite child, as in /similar results
+            parent_id=uuid.uuid4() if i % 4 == 3 else None,
+            order=1 if i % 4 == 3 else None,
+            preview_text=build_preview_text(payload["content"]),
+            first_subquestion_id=uuid.uuid4() if i % 5 == 0 else None,
+            attempted=attempted,
+            correct=(i % 2 == 0) if attempted else None,
+        ))
+    return rows
+
+
+def build_cases(seed: int = 0) -> Dict[str, Callable[[], Any]]:
+    configure_mappers()
+    rng = random.Random(seed)
+
+    single = question_from_payload(single_question(rng, "table-analysis"))
+    group = composite_group(rng, "reading-comprehension", 4)
+    parent = question_from_payload(group[0])
+    child = question_from_payload(group[1], parent_id=parent.id)
+    tutoring_memories = memories(rng, 5, "tutoring")
+    onboarding_memories = memories(rng, 12, "onboarding")
+    rows = summary_rows(rng, PAGE_SIZE)
+    summaries = build_summaries(rows, uuid.uuid4())
+    # The parentId alias must not swallow values passed by field name
+    assert [s.parent_id for s in summaries] == [r.parent_id for r in rows]
+    hit = QuestionSearchHit(
+        id=child.id, type=child.type, difficulty=child.difficulty, tags=child.tags,
+        parent_id=child.parent_id, order=child.order, rank=0.5,
+    )
+    assert f'"parentId":"{parent.id}"' in hit.model_dump_json(by_alias=True)
+    ingest_payload = single_question(rng, "problem-solving")
+    user_id = uuid.uuid4()
+
+    return {
+        "tutoring.extract_text": lambda: extract_text(single),
+        "tutoring.build_prompt": lambda: build_tutoring_prompt(
+            tutoring_memories, "Why is option C right here?", {"question": child, "parent": parent},
+        ),
+        "onboarding.build_prompt": lambda: build_onboarding_prompt(onboarding_memories, "I'm aiming for 705"),
+        "onboarding.extract_fields": lambda: extract_updated_fields(ONBOARDING_REPLY),
+        "onboarding.extract_fields_miss": lambda: extract_updated_fields(TUTORING_REPLY),
+        "summaries.build_page": lambda: build_summaries(rows, user_id),
+        "summaries.serialize_page": lambda: _summary_list_adapter.dump_json(summaries, by_alias=True),
+        "question.serialize_single": lambda: question_service.build_single_question(single)
+            .model_dump_json(by_alias=True),
+        "question.serialize_child": lambda: question_service.build_single_question(child, parent)
+            .model_dump_json(by_alias=True),
+        "ingest.trusted_row": lambda: question_row(
+            trusted_row_adapter.validate_python(ingest_payload), uuid.uuid4(), None,
+        ),
+    }
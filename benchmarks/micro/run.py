@@ -0,0 +1,115 @@
+# benchmarks/micro/run.py
+"""
+Time the per-request hot paths in benchmarks.micro.cases.
+
+    python -m benchmarks.micro.run                                   # print timings
+    python -m benchmarks.micro.run --compare benchmarks/micro/baseline.json
+    python -m benchmarks.micro.run --out benchmarks/micro/baseline.json
+
+Each case is run in batches sized to take ~0.2s (timeit's autorange); the
+reported time per call is that of the best of --repeat batches, with the
+median alongside. The best batch is the least disturbed by other load on
+the machine, so it is what --compare checks: it reads an earlier --out
+file, prints the change per case and exits 1 if any case got slower by
+more than --threshold percent (default 25: run-to-run noise on a busy
+laptop is around 10-20%, so lower it on a quiet machine). The checked-in
+baseline.json is refreshed with --out in the same PR as a deliberate
+change, so the diff shows up in review; compare on the machine that wrote
+it, as absolute timings don't transfer.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.micro.cases import build_cases
+
+Results = Dict[str, Dict[str, float]]
+
+
+def time_case(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    batches = timer.repeat(repeat=repeat, number=number)
+    per_call = [t / number * 1e6 for t in batches]
+    return {"loops": number, "best_us": min(per_call), "median_us": statistics.median(per_call)}
+
+
+def compare(results: Results, baseline: Results, threshold: float) -> List[str]:
+    """Print the table with changes against the baseline; return the regressed case names."""
+    regressed = []
+    width = max(len(name) for name in results)
+    print(f"{'case':<{width}} {'best':>11} {'median':>11} {'before':>11} {'change':>8}")
+    for name, stats in results.items():
+        row = f"{name:<{width}} {stats['best_us']:>9.2f}us {stats['median_us']:>9.2f}us"
+        before = baseline.get(name)
+        if before:
+            change = (stats["best_us"] - before["best_us"]) / before["best_us"] * 100
+            row += f" {before['best_us']:>9.2f}us {change:>+7.1f}%"
+            if change > threshold:
+                regressed.append(name)
+                row += "  REGRESSION"
+        else:
+            row += f" {'(new)':>11}"
+        print(row)
+    return regressed
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=9, help="timed batches per case")
+    parser.add_argument("--cases", type=lambda s: s.split(","), help="comma-separated case names (default: all)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic fixtures")
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--compare", help="results JSON from an earlier --out run")
+    parser.add_argument("--threshold", type=float, default=25.0, help="allowed slowdown in percent")
+    args = parser.parse_args()
+
+    cases = build_cases(args.seed)
+    names = args.cases or list(cases)
+    unknown = set(names) - set(cases)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    results = {name: time_case(cases[name], args.repeat) for name in names}
+
+    baseline: Results = {}
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)["results"]
+    regressed = compare(results, baseline, args.threshold)
+
+    if args.out:
+        output = {
+            "meta": {
+                "commit": _git_commit(),
+                "finished_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }
+        with open(args.out, "w") as fh:
+            json.dump(output, fh, indent=2)
+            fh.write("\n")
+
+    if regressed:
+        print(f"{len(regressed)} case(s) slower than baseline by more than {args.threshold:g}%: {', '.join(regressed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/stats.py
+"""Latency summaries and before/after tables shared by the benchmarks."""
+import json
+import statistics
+from typing import Dict, List, Optional
+
+Results = Dict[str, Dict[str, float]]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Count, mean and p50/p95/p99 of millisecond samples."""
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "p99_ms": percentile(samples, 99),
+    }
+
+
+def load_results(path: str) -> Results:
+    with open(path) as fh:
+        data = json.load(fh)
+    # Load-test output nests the per-endpoint results under "results"
+    return data.get("results", data)
+
+
+def print_results(results: Results, baseline: Optional[Results] = None, extra: str = "") -> None:
+    """
+    One row per entry; with a baseline, a second row of relative changes.
+    `extra` names an additional numeric column (e.g. "rps").
+    """
+    width = max([12] + [len(name) for name in results])
+    header = f"{'endpoint':<{width}} {'n':>6} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}"
+    print(header + (f" {extra:>9}" if extra else ""))
+    keys = ("mean_ms", "p50_ms", "p95_ms", "p99_ms")
+    for name, stats in results.items():
+        row = f"{name:<{width}} {stats['n']:>6} " + " ".join(f"{stats[k]:>7.1f}ms" for k in keys)
+        if extra:
+            row += f" {stats.get(extra, 0):>9.1f}"
+        print(row)
+        if baseline and name in baseline:
+            before = baseline[name]
+            changes = [
+                f"{(stats[k] - before[k]) / before[k] * 100:>+8.1f}%" if before.get(k) else f"{'':>9}"
+                for k in keys + ((extra,) if extra else ())
+            ]
+            print(f"{'  vs before':<{width}} {'':>6} " + " ".join(changes))